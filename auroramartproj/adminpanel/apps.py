@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class AdminpanelConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'adminpanel'
+
+    def ready(self):
+        # Register Product signal handlers that invalidate catalog caches.
+        from . import signals  # noqa: F401
@@ -0,0 +1,122 @@
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Max
+from django.dispatch import Signal
+from django.utils import timezone
+
+# Sent by ProductQuerySet bulk writes, which bypass post_save/post_delete.
+# Receivers get ``pks``, the ids of the Product rows that were written, or
+# None when the rows were not enumerated (see ProductQuerySet.update), and
+# ``fields``, the names of the columns written, or None for whole rows.
+products_changed = Signal()
+
+# Cache key holding the current catalog version. Storefront caches derived
+# from Product rows embed this number in their own keys, so bumping it makes
+# every stale entry unreachable without having to track and delete them.
+# Every bump stores a fresh time.time_ns() rather than incrementing, so a key
+# that was evicted never restarts at a number older entries are still stored
+# under, and two workers bumping at once cannot both land on the same value
+# (the file-based cache has no atomic incr).
+CATALOG_VERSION_KEY = "catalog:version"
+
+# Cache key holding the time of the last committed Product change, used as
+# the Last-Modified/ETag basis for catalog pages.
+CATALOG_LAST_MODIFIED_KEY = "catalog:last_modified"
+
+
+def get_catalog_version():
+    """Return the current catalog version, initialising it on first use."""
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        version = time.time_ns()
+        if not cache.add(CATALOG_VERSION_KEY, version, timeout=None):
+            version = cache.get(CATALOG_VERSION_KEY, version)
+    return version
+
+
+def bump_catalog_version():
+    """Invalidate catalog-derived caches once the current transaction commits."""
+    transaction.on_commit(_bump_now)
+
+
+def _bump_now():
+    cache.set_many(
+        {CATALOG_LAST_MODIFIED_KEY: timezone.now(), CATALOG_VERSION_KEY: time.time_ns()},
+        timeout=None,
+    )
+
+
+def touch_catalog():
+    """Move Last-Modified forward after commit without invalidating derived caches.
+
+    For writes no cached listing, count or index depends on, such as a stock
+    change that leaves a product in (or out of) stock; the API and feed
+    validators still see the change.
+    """
+    transaction.on_commit(lambda: cache.set(CATALOG_LAST_MODIFIED_KEY, timezone.now(), timeout=None))
+
+
+def get_catalog_last_modified():
+    """Return when the catalog last changed (falls back to the newest Product.updated_at)."""
+    last_modified = cache.get(CATALOG_LAST_MODIFIED_KEY)
+    if last_modified is None:
+        from .models import Product
+
+        last_modified = Product.objects.aggregate(latest=Max("updated_at"))["latest"] or timezone.now()
+        cache.add(CATALOG_LAST_MODIFIED_KEY, last_modified, timeout=None)
+    return last_modified
+
+
+def catalog_cache_key(*parts):
+    """Build a cache key scoped to the current catalog version."""
+    return ":".join(["catalog", str(get_catalog_version()), *map(str, parts)])
+
+
+# Per-product version stamps, for caches that depend on a handful of products
+# (e.g. a product page and its recommendations) and should survive unrelated
+# catalog writes. Stamps are nanosecond timestamps so an evicted key can never
+# be re-initialised to a value some stale entry still remembers.
+PRODUCT_VERSION_KEY = "catalog:product:{}"
+
+# Stamp shared by every product, moved forward by bulk writes whose rows are
+# not known individually. A product's version is the newer of the two, so
+# such a write changes every product's version at once.
+ALL_PRODUCTS_VERSION_KEY = "catalog:product:all"
+
+
+def get_product_versions(pks):
+    """Return ``{pk: version}`` for the given product ids."""
+    keys = {PRODUCT_VERSION_KEY.format(pk): pk for pk in pks}
+    found = cache.get_many([ALL_PRODUCTS_VERSION_KEY, *keys])
+    floor = found.get(ALL_PRODUCTS_VERSION_KEY)
+    if floor is None:
+        # Missing or evicted: a fresh value, so no stale entry matches it.
+        floor = time.time_ns()
+        if not cache.add(ALL_PRODUCTS_VERSION_KEY, floor, timeout=None):
+            floor = cache.get(ALL_PRODUCTS_VERSION_KEY, floor)
+    versions = {}
+    for key, pk in keys.items():
+        version = found.get(key)
+        if version is None:
+            version = time.time_ns()
+            if not cache.add(key, version, timeout=None):
+                version = cache.get(key, version)
+        versions[pk] = max(version, floor)
+    return versions
+
+
+def bump_product_versions(pks):
+    """Invalidate per-product caches for `pks` once the transaction commits.
+
+    ``pks=None`` invalidates them for every product.
+    """
+    if pks is None:
+        transaction.on_commit(lambda: cache.set(ALL_PRODUCTS_VERSION_KEY, time.time_ns(), timeout=None))
+        return
+    pks = list(pks)
+    if pks:
+        transaction.on_commit(lambda: cache.set_many(
+            {PRODUCT_VERSION_KEY.format(pk): time.time_ns() for pk in pks}, timeout=None,
+        ))
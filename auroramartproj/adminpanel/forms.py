@@ -1,9 +1,11 @@
 from django import forms
 from.models import Product
+from .images import schedule_derivatives
 from django.contrib.auth.models import User
 from django.contrib.auth.forms import UserCreationForm
 from django.core.exceptions import ValidationError
-from onlinestorefront.models import Order as StorefrontOrder
+from django.db import transaction
+from onlinestorefront.models import Order as StorefrontOrder, create_shopper_records
 
 class ProductForm(forms.ModelForm):
 
@@ -24,6 +26,20 @@ class ProductForm(forms.ModelForm):
             'status': forms.Select(attrs={'class': 'select'}),
         }
 
+    def save(self, commit=True):
+        product = super().save(commit=False)
+        image_changed = 'image' in self.changed_data
+        if image_changed:
+            # Old derivatives no longer match; templates fall back to the original until regenerated.
+            product.image_hash = ''
+            product.image_width = 0
+        if commit:
+            product.save()
+            self._save_m2m()
+            if image_changed and product.image:
+                schedule_derivatives(product.pk)
+        return product
+
 class UploadCSVForm(forms.Form):
     
     csv_file = forms.FileField(label='Select a CSV file')
@@ -93,7 +109,9 @@ class CustomerCreateForm(BaseUserCreateForm):
         user.is_staff = False
         user.is_superuser = False
         if commit:
-            user.save()
+            with transaction.atomic():
+                user.save()
+                create_shopper_records(user)
         return user
     
 class UserUpdateForm(forms.ModelForm):
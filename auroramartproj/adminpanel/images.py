@@ -0,0 +1,209 @@
+"""Resized JPEG/WebP derivatives of product images.
+
+Derivatives are stored under ``products/derived/<content hash>/<width>.<ext>``,
+so two products with the same picture share one set of files and generating
+twice is a no-op. Images are never upscaled: only the sizes narrower than the
+original are written, plus one at the original's own width. The hash and that
+width are recorded on ``Product.image_hash``/``image_width`` once all variants
+exist; templates only emit ``srcset`` for products that have a hash.
+
+Generation runs in a background thread after the saving transaction commits
+(see ``schedule_derivatives``) or in bulk with
+``python manage.py generate_product_images``.
+"""
+import hashlib
+import logging
+import os
+import threading
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# Derivative name -> target width in pixels. Images are never upscaled.
+DERIVATIVE_SIZES = {
+    "thumb": 320,   # product grid cards
+    "detail": 800,  # product detail page
+    "retina": 1600,  # detail page on high-density screens
+}
+DERIVATIVE_FORMATS = {
+    "jpg": ("JPEG", {"quality": 82, "optimize": True, "progressive": True}),
+    "webp": ("WEBP", {"quality": 80, "method": 6}),
+}
+DERIVED_DIR = "products/derived"
+
+
+def derivative_name(image_hash, size, ext):
+    return f"{DERIVED_DIR}/{image_hash}/{DERIVATIVE_SIZES[size]}.{ext}"
+
+
+def generated_sizes(source_width):
+    """Sizes written for an original `source_width` pixels wide (0 if unknown).
+
+    Every size narrower than the original, then the first one that reaches
+    it, which holds the original width.
+    """
+    sizes = []
+    for size, width in DERIVATIVE_SIZES.items():
+        sizes.append(size)
+        if source_width and width >= source_width:
+            break
+    return sizes
+
+
+def derivative_url(image_hash, size, ext, source_width=0):
+    """URL of `size`, or of the largest generated size if the original is narrower."""
+    sizes = generated_sizes(source_width)
+    if size not in sizes:
+        size = sizes[-1]
+    return default_storage.url(derivative_name(image_hash, size, ext))
+
+
+def srcset(image_hash, ext, source_width=0):
+    """Return an ``srcset`` attribute value listing the generated sizes at their real widths."""
+    entries = []
+    for size in generated_sizes(source_width):
+        width = DERIVATIVE_SIZES[size]
+        if source_width:
+            width = min(width, source_width)
+        entries.append(f"{derivative_url(image_hash, size, ext)} {width}w")
+    return ", ".join(entries)
+
+
+def delete_derivatives(image_hash):
+    """Remove every derivative of `image_hash` and its directory."""
+    for size in DERIVATIVE_SIZES:
+        for ext in DERIVATIVE_FORMATS:
+            default_storage.delete(derivative_name(image_hash, size, ext))
+    try:
+        os.rmdir(default_storage.path(f"{DERIVED_DIR}/{image_hash}"))
+    except (NotImplementedError, OSError):
+        # Storage without directories, or something else left in there.
+        pass
+
+
+def content_hash(field_file):
+    digest = hashlib.sha256()
+    field_file.open("rb")
+    try:
+        for chunk in field_file.chunks():
+            digest.update(chunk)
+    finally:
+        field_file.close()
+    return digest.hexdigest()[:32]
+
+
+def _encode(image, fmt, options):
+    if fmt == "JPEG" and image.mode != "RGB":
+        image = image.convert("RGB")
+    buffer = BytesIO()
+    image.save(buffer, fmt, **options)
+    return ContentFile(buffer.getvalue())
+
+
+# Striped per-hash locks, so two background threads processing the same
+# picture (e.g. two products saved back to back) do not both write it.
+# adminpanel.storage takes the same lock to serialise uploads and deletions.
+_hash_locks = [threading.Lock() for _ in range(64)]
+
+
+def hash_lock(image_hash):
+    """Return the in-process lock guarding files derived from `image_hash`."""
+    return _hash_locks[int(image_hash[:8], 16) % len(_hash_locks)]
+
+
+def generate_derivatives(field_file):
+    """Write any missing derivatives of `field_file`; return its (content hash, width)."""
+    image_hash = content_hash(field_file)
+    with hash_lock(image_hash):
+        source_width = _write_missing(field_file, image_hash)
+    return image_hash, source_width
+
+
+# EXIF orientations that rotate the picture by 90 degrees (see exif_transpose).
+_ROTATED_ORIENTATIONS = {5, 6, 7, 8}
+
+
+def _display_width(field_file):
+    # Reads the header only; the pixel data is not decoded.
+    field_file.open("rb")
+    try:
+        with Image.open(field_file) as source:
+            width, height = source.size
+            if source.getexif().get(0x0112) in _ROTATED_ORIENTATIONS:
+                width = height
+    finally:
+        field_file.close()
+    return width
+
+
+def _write_missing(field_file, image_hash):
+    source_width = _display_width(field_file)
+    missing = [
+        (size, ext)
+        for size in generated_sizes(source_width)
+        for ext in DERIVATIVE_FORMATS
+        if not default_storage.exists(derivative_name(image_hash, size, ext))
+    ]
+    if not missing:
+        return source_width
+
+    field_file.open("rb")
+    try:
+        with Image.open(field_file) as source:
+            source = ImageOps.exif_transpose(source)
+            source.load()
+    finally:
+        field_file.close()
+    if source.mode not in ("RGB", "RGBA"):
+        source = source.convert("RGBA" if "transparency" in source.info else "RGB")
+
+    for size, ext in missing:
+        width = DERIVATIVE_SIZES[size]
+        resized = source.copy()
+        resized.thumbnail((width, width * 4), Image.Resampling.LANCZOS)
+        fmt, options = DERIVATIVE_FORMATS[ext]
+        name = derivative_name(image_hash, size, ext)
+        saved = default_storage.save(name, _encode(resized, fmt, options))
+        if saved != name:
+            # Another process wrote the same variant first; the storage gave
+            # ours a suffixed name. The contents are identical, so drop it.
+            default_storage.delete(saved)
+    return source_width
+
+
+def process_product_image(pk):
+    """Generate derivatives for one product and record the hash on it."""
+    from .models import Product
+
+    product = Product.objects.filter(pk=pk).only("pk", "image", "image_hash", "image_width").first()
+    if product is None or not product.image:
+        return None
+    image_hash, image_width = generate_derivatives(product.image)
+    if (image_hash, image_width) != (product.image_hash, product.image_width):
+        # Only record the hash if the image was not replaced in the meantime.
+        Product.objects.filter(pk=pk, image=product.image.name).update(
+            image_hash=image_hash, image_width=image_width,
+        )
+    return image_hash
+
+
+def _process_in_background(pk):
+    try:
+        process_product_image(pk)
+    except Exception:
+        logger.exception("Could not generate image derivatives for product %s", pk)
+    finally:
+        # This thread opened its own database connection.
+        connections.close_all()
+
+
+def schedule_derivatives(pk):
+    """Generate derivatives off the request thread once the transaction commits."""
+    transaction.on_commit(
+        lambda: threading.Thread(target=_process_in_background, args=(pk,), daemon=True).start()
+    )
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from adminpanel import images
+from adminpanel.models import Product
+
+
+class Command(BaseCommand):
+    help = "Generate resized JPEG/WebP derivatives for product images that do not have them yet."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Re-check every product with an image (existing derivative files are kept).",
+        )
+
+    def handle(self, *args, **options):
+        qs = Product.objects.exclude(image="").exclude(image__isnull=True)
+        if not options["all"]:
+            qs = qs.filter(image_hash="")
+        done = failed = 0
+        for pk in qs.order_by("pk").values_list("pk", flat=True).iterator():
+            try:
+                images.process_product_image(pk)
+                done += 1
+            except Exception as exc:
+                failed += 1
+                self.stderr.write(f"Product {pk}: {exc}")
+        self.stdout.write(self.style.SUCCESS(f"Processed {done} product image(s), {failed} failed."))
@@ -0,0 +1,22 @@
+import adminpanel.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("adminpanel", "0009_product_image_hash"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="product",
+            name="image",
+            field=models.ImageField(
+                blank=True,
+                null=True,
+                storage=adminpanel.storage.ContentHashStorage(),
+                upload_to="products/",
+            ),
+        ),
+    ]
@@ -1,4 +1,54 @@
 from django.db import models
+from django.utils import timezone
+
+from . import images
+from .catalog import products_changed
+from .storage import product_image_storage
+
+
+# Columns the storefront search index is built from (see
+# onlinestorefront.search_index); bulk updates touching none of them do not
+# need to know which rows they changed.
+SEARCH_INDEXED_FIELDS = frozenset({
+    "product_name", "product_description", "product_category", "product_subcategory", "status",
+})
+
+
+class ProductQuerySet(models.QuerySet):
+    """Bulk writes skip model signals, so announce them via `products_changed`."""
+
+    def bulk_create(self, *args, **kwargs):
+        objs = super().bulk_create(*args, **kwargs)
+        products_changed.send(sender=self.model, pks=[o.pk for o in objs if o.pk is not None], fields=None)
+        return objs
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        objs = list(objs)
+        now = timezone.now()
+        for obj in objs:
+            obj.updated_at = now
+        fields = list(fields)
+        if "updated_at" not in fields:
+            fields.append("updated_at")
+        rows = super().bulk_update(objs, fields, *args, **kwargs)
+        products_changed.send(sender=self.model, pks=[o.pk for o in objs], fields=frozenset(fields))
+        return rows
+
+    def update(self, **kwargs):
+        kwargs.setdefault("updated_at", timezone.now())
+        fields = frozenset(kwargs)
+        if fields.isdisjoint(SEARCH_INDEXED_FIELDS):
+            # Nothing needs the individual ids, so skip reading them.
+            rows = super().update(**kwargs)
+            if rows:
+                products_changed.send(sender=self.model, pks=None, fields=fields)
+            return rows
+        pks = list(self.values_list("pk", flat=True))
+        rows = super().update(**kwargs)
+        if rows:
+            products_changed.send(sender=self.model, pks=pks, fields=fields)
+        return rows
+
 
 # Create your models here.
 class Product(models.Model):
@@ -15,4 +65,51 @@ class Product(models.Model):
     quantity_on_hand = models.IntegerField(blank=False)
     unit_price = models.FloatField(blank=False)
     status = models.CharField(max_length=8, choices=STATUS_CHOICES, default='Active')
-    image = models.ImageField(upload_to='products/', null=True, blank=True)
+    image = models.ImageField(upload_to='products/', storage=product_image_storage, null=True, blank=True)
+    # Content hash of `image` once its resized derivatives exist (see adminpanel.images).
+    image_hash = models.CharField(max_length=32, blank=True, default='', editable=False)
+    # Width of the original in pixels, which caps the derivative sizes (0 if unknown).
+    image_width = models.PositiveIntegerField(default=0, editable=False)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    objects = ProductQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Storefront listings filter on status/category/subcategory and seek on id.
+            models.Index(
+                fields=['status', 'product_category', 'product_subcategory', 'id'],
+                name='product_listing_idx',
+            ),
+            # Category pages seek on id across all subcategories.
+            models.Index(fields=['status', 'product_category', 'id'], name='product_category_idx'),
+            # Price band and in-stock facets.
+            models.Index(fields=['status', 'unit_price'], name='product_price_idx'),
+            models.Index(fields=['status', 'quantity_on_hand'], name='product_stock_idx'),
+            # SKU lookups (catalog API, recommendation batches).
+            models.Index(fields=['sku_code'], name='product_sku_idx'),
+        ]
+
+    @property
+    def image_thumb_url(self):
+        return images.derivative_url(self.image_hash, "thumb", "jpg", self.image_width)
+
+    @property
+    def image_detail_url(self):
+        return images.derivative_url(self.image_hash, "detail", "jpg", self.image_width)
+
+    @property
+    def image_srcset(self):
+        return images.srcset(self.image_hash, "jpg", self.image_width)
+
+    @property
+    def image_webp_srcset(self):
+        return images.srcset(self.image_hash, "webp", self.image_width)
+
+    def save(self, *args, **kwargs):
+        # auto_now only applies to fields being written; keep updated_at
+        # current for partial saves such as save(update_fields=['status']).
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "updated_at" not in update_fields:
+            kwargs["update_fields"] = list(update_fields) + ["updated_at"]
+        super().save(*args, **kwargs)
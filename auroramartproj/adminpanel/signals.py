@@ -0,0 +1,57 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .catalog import bump_catalog_version, bump_product_versions, products_changed, touch_catalog
+from .models import Product
+from .storage import release, settle
+
+
+# Partial saves touching only these fields (e.g. checkout deducting stock)
+# leave catalog-wide caches valid unless the product runs out or comes back.
+STOCK_FIELDS = frozenset({"quantity_on_hand", "updated_at"})
+
+
+@receiver(pre_save, sender=Product)
+def product_image_replaced(sender, instance, update_fields=None, **kwargs):
+    # Remember the stored image so post_save can release it if it was replaced.
+    instance._previous_image = None
+    if instance.pk and (update_fields is None or "image" in update_fields):
+        instance._previous_image = (
+            Product.objects.filter(pk=instance.pk).values_list("image", flat=True).first()
+        )
+
+
+@receiver(pre_save, sender=Product)
+def product_stock_changed(sender, instance, update_fields=None, **kwargs):
+    # Note whether a stock-only save leaves the in-stock facet unchanged.
+    instance._stock_only = False
+    if instance.pk and update_fields and STOCK_FIELDS.issuperset(update_fields):
+        previous = Product.objects.filter(pk=instance.pk).values_list("quantity_on_hand", flat=True).first()
+        instance._stock_only = previous is not None and (previous > 0) == (instance.quantity_on_hand > 0)
+
+
+@receiver(post_save, sender=Product)
+def product_saved(sender, instance, **kwargs):
+    if getattr(instance, "_stock_only", False):
+        touch_catalog()
+    else:
+        bump_catalog_version()
+    bump_product_versions([instance.pk])
+    settle(instance.image.name)
+    previous = getattr(instance, "_previous_image", None)
+    if previous and previous != instance.image.name:
+        release(previous, Product)
+
+
+@receiver(post_delete, sender=Product)
+def product_deleted(sender, instance, **kwargs):
+    bump_catalog_version()
+    bump_product_versions([instance.pk])
+    release(instance.image.name, Product)
+
+
+@receiver(products_changed, sender=Product)
+def products_bulk_changed(sender, pks, **kwargs):
+    bump_catalog_version()
+    # pks is None for updates that did not read their ids: bump every product.
+    bump_product_versions(pks)
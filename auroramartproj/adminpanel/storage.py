@@ -0,0 +1,117 @@
+"""Content-addressed storage for product images.
+
+Uploads are stored as ``<upload dir>/<aa>/<hash>.<ext>`` where ``hash`` is
+the SHA-256 of the file contents, so saving a picture that is already stored
+(e.g. the same image on many SKUs in a bulk load) writes nothing and returns
+the existing name. A file is only deleted once no Product references it any
+more (see ``release``); the reference count is the number of rows pointing at
+the name. Saving and releasing a hash are serialised on the same in-process
+lock as derivative generation, and a hash stays pinned from its upload until
+the row that references it is committed (see ``settle``), so a release that
+races an upload of the same bytes cannot delete the file from under it.
+
+Because a name always maps to the same bytes, its URL can be cached forever;
+``IMMUTABLE_MEDIA_RE`` matches such paths (including the derivatives written
+by ``adminpanel.images``).
+"""
+import hashlib
+import os
+import re
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.utils.deconstruct import deconstructible
+
+from .images import delete_derivatives, hash_lock
+
+HASH_LENGTH = 32
+
+HASHED_NAME_RE = re.compile(rf"(?:^|/)[0-9a-f]{{2}}/[0-9a-f]{{{HASH_LENGTH}}}\.\w+$")
+
+# Media paths whose contents never change: hashed uploads and their derivatives.
+IMMUTABLE_MEDIA_RE = re.compile(
+    rf"^products/(?:[0-9a-f]{{2}}/[0-9a-f]{{{HASH_LENGTH}}}|derived/[0-9a-f]{{{HASH_LENGTH}}}/\d+)\.\w+$"
+)
+
+# Hashes saved by this process whose referencing row is not committed yet.
+_pending = set()
+
+
+def file_hash(content):
+    digest = hashlib.sha256()
+    if hasattr(content, "seek"):
+        content.seek(0)
+    for chunk in content.chunks():
+        digest.update(chunk)
+    if hasattr(content, "seek"):
+        content.seek(0)
+    return digest.hexdigest()[:HASH_LENGTH]
+
+
+@deconstructible
+class ContentHashStorage(FileSystemStorage):
+    """FileSystemStorage that names files by content hash and never duplicates them."""
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, "chunks"):
+            content = File(content, name)
+        digest = file_hash(content)
+        ext = os.path.splitext(name)[1].lower()
+        hashed = os.path.join(os.path.dirname(name), digest[:2], f"{digest}{ext}").replace("\\", "/")
+        with hash_lock(digest):
+            _pending.add(digest)
+            if self.exists(hashed):
+                return hashed
+            saved = super()._save(hashed, content)
+        if saved != hashed:
+            # Another process created `hashed` first and FileSystemStorage
+            # fell back to a suffixed name; keep the original.
+            self.delete(saved)
+        return hashed
+
+
+product_image_storage = ContentHashStorage()
+
+
+def _digest(name):
+    return os.path.splitext(os.path.basename(name))[0]
+
+
+def settle(name):
+    """Unpin `name` once the transaction saving the row that references it commits.
+
+    If that transaction rolls back the hash stays pinned, and the file is
+    only kept longer than necessary.
+    """
+    if name and HASHED_NAME_RE.search(name):
+        digest = _digest(name)
+        transaction.on_commit(lambda: _pending.discard(digest))
+
+
+def release(name, model, field_name="image", hash_field="image_hash"):
+    """Delete the stored file `name` after commit unless another row still uses it.
+
+    The resized derivatives (``products/derived/<hash>/``) go with it, unless
+    a row with the same picture under another name still records the hash.
+    Only content-addressed names are released; files uploaded before this
+    storage existed may be shared in ways the database does not record.
+    """
+    if not name or not HASHED_NAME_RE.search(name):
+        return
+    digest = _digest(name)
+
+    def _delete_if_unreferenced():
+        rows = model._default_manager
+        with hash_lock(digest):
+            # Checked under the lock: an upload of the same bytes may be
+            # reusing the file for a row that is not committed yet.
+            if digest in _pending or rows.filter(**{field_name: name}).exists():
+                return
+            product_image_storage.delete(name)
+            if not rows.filter(**{hash_field: digest}).exists():
+                delete_derivatives(digest)
+
+    transaction.on_commit(_delete_if_unreferenced)
@@ -801,20 +801,22 @@ def customer_orders(request, pk):
 
     customer = Customer.objects.select_related('user').filter(user=user).first()
 
+    # Rendered from the summary columns written at checkout; the full lines
+    # are on the order detail page.
     orders_qs = (
         StorefrontOrder.objects.filter(customer=customer)
-        .prefetch_related('order_items', 'order_items__product')
-        .order_by('-created_at')
+        .only('id', 'status', 'created_at', 'total_amount', 'item_count', 'unit_count', 'item_preview')
+        .order_by('-created_at', '-id')
     )
 
     orders = []
     for o in orders_qs:
         items = []
-        for it in o.order_items.all():
-            unit = float(it.price_at_purchase)
-            qty = int(it.quantity)
+        for it in o.item_preview:
+            unit = float(it['unit'])
+            qty = int(it['qty'])
             items.append({
-                'name': getattr(it.product, 'product_name', 'Item'),
+                'name': it['name'],
                 'qty': qty,
                 'unit': unit,
                 'total': round(unit * qty, 2),
@@ -824,7 +826,10 @@ def customer_orders(request, pk):
             'status': o.status,
             'created_at': o.created_at,
             'total_amount': float(o.total_amount),
+            'item_count': o.item_count,
+            'unit_count': o.unit_count,
             'items': items,
+            'remaining': o.preview_remaining,
         })
 
     return render(request, 'adminpanel/user_customer_orders.html', {
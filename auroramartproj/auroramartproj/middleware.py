@@ -0,0 +1,60 @@
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.http import FileResponse
+from django.utils._os import safe_join
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.http import http_date
+
+from .storage import compressed_variant
+from .views import IMMUTABLE_MAX_AGE
+
+# ManifestStaticFilesStorage inserts a 12 character hex hash before the extension.
+HASHED_STATIC_RE = re.compile(r"\.[0-9a-f]{12}\.\w+$")
+# Unhashed names may change on the next deploy.
+UNHASHED_MAX_AGE = 60 * 60
+
+
+class PrecompressedStaticMiddleware(MiddlewareMixin):
+    """Serve collected static files from STATIC_ROOT, preferring .br/.gz siblings.
+
+    Only active when DEBUG is off (runserver serves static files itself in
+    development). Fingerprinted names are marked immutable for a year.
+    MiddlewareMixin keeps it async-capable, so it does not force the rest of
+    the ASGI middleware chain into sync mode.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.prefix = "/" + settings.STATIC_URL.lstrip("/")
+
+    def process_request(self, request):
+        if not settings.DEBUG and request.method in ("GET", "HEAD") and request.path.startswith(self.prefix):
+            return self.serve(request, request.path[len(self.prefix):])
+        return None
+
+    def serve(self, request, name):
+        try:
+            path = safe_join(settings.STATIC_ROOT, name)
+        except ValueError:
+            return None
+        if not os.path.isfile(path):
+            return None
+
+        content_type, _ = mimetypes.guess_type(path)
+        served, encoding = compressed_variant(path, request.headers.get("Accept-Encoding"))
+        stat = os.stat(served)
+        response = FileResponse(open(served, "rb"), content_type=content_type or "application/octet-stream")
+        response["Content-Length"] = stat.st_size
+        response["Last-Modified"] = http_date(stat.st_mtime)
+        if encoding:
+            response["Content-Encoding"] = encoding
+        patch_vary_headers(response, ("Accept-Encoding",))
+        if HASHED_STATIC_RE.search(name):
+            patch_cache_control(response, public=True, max_age=IMMUTABLE_MAX_AGE, immutable=True)
+        else:
+            patch_cache_control(response, public=True, max_age=UNHASHED_MAX_AGE)
+        return response
@@ -41,10 +41,12 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'auroramartproj.middleware.PrecompressedStaticMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'onlinestorefront.middleware.CustomerCartMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -86,6 +88,36 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Storefront catalog caches are keyed by a catalog version (see adminpanel.catalog),
+# which every worker process must agree on, so the cache lives on disk and is
+# shared by all processes on the host. Use Redis/Memcached when the site runs
+# on more than one host. Anonymous full pages get their own cache so they
+# cannot cull the version keys, cart counts and fragments kept in 'default'.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache' / 'default',
+        'TIMEOUT': 60 * 60,
+        'OPTIONS': {
+            'MAX_ENTRIES': 5000,
+            'CULL_FREQUENCY': 4,
+        },
+    },
+    'pages': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache' / 'pages',
+        'TIMEOUT': 60 * 60,
+        'OPTIONS': {
+            'MAX_ENTRIES': 2000,
+            'CULL_FREQUENCY': 3,
+        },
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -125,6 +157,18 @@ STATICFILES_DIRS = [
     BASE_DIR / "static",
     BASE_DIR / "auroramartproj/static",
 ]
+STATIC_ROOT = BASE_DIR / "staticfiles"
+
+# collectstatic fingerprints file names and writes .gz/.br siblings, which
+# PrecompressedStaticMiddleware serves when DEBUG is off.
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "auroramartproj.storage.CompressedManifestStaticFilesStorage",
+    },
+}
 
 # django-crispy-forms configuration (use Bootstrap 5 templates)
 CRISPY_ALLOWED_TEMPLATE_PACKS = "bootstrap5"
@@ -0,0 +1,63 @@
+"""Static files storage that fingerprints and precompresses assets.
+
+``collectstatic`` writes every file under a content-hashed name (via
+``ManifestStaticFilesStorage``) and, for compressible types, ``.gz`` and
+``.br`` siblings next to it. ``auroramartproj.middleware.PrecompressedStaticMiddleware``
+serves those siblings directly. Brotli output needs the optional ``Brotli``
+package; without it only ``.gz`` files are written.
+"""
+import gzip
+import os
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+# Types worth compressing; images and fonts other than SVG are already compressed.
+COMPRESSIBLE_EXTENSIONS = (".css", ".js", ".svg", ".json", ".map", ".txt", ".html", ".xml", ".ico")
+# Below this size the encoding overhead outweighs the savings.
+MIN_COMPRESS_SIZE = 256
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if dry_run:
+            return
+        for name in self.hashed_files.values():
+            for compressed_name in self._compress(name):
+                yield name, compressed_name, True
+
+    def _compress(self, name):
+        if not name.endswith(COMPRESSIBLE_EXTENSIONS) or not self.exists(name):
+            return
+        with self.open(name) as original:
+            data = original.read()
+        if len(data) < MIN_COMPRESS_SIZE:
+            return
+        encoders = [(".gz", lambda raw: gzip.compress(raw, compresslevel=9, mtime=0))]
+        if brotli is not None:
+            encoders.append((".br", lambda raw: brotli.compress(raw, quality=11)))
+        for suffix, encode in encoders:
+            compressed = encode(data)
+            if len(compressed) >= len(data):
+                continue
+            target = name + suffix
+            if self.exists(target):
+                self.delete(target)
+            self._save(target, ContentFile(compressed))
+            yield target
+
+
+def compressed_variant(path, accept_encoding):
+    """Return (path, encoding) of the best precompressed sibling of `path`, if any."""
+    accepted = {token.split(";")[0].strip() for token in (accept_encoding or "").split(",")}
+    for encoding, suffix in (("br", ".br"), ("gzip", ".gz")):
+        if encoding in accepted and os.path.isfile(path + suffix):
+            return path + suffix, encoding
+    return path, None
@@ -15,10 +15,11 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from . import views
 from django.conf import settings
 from django.conf.urls.static import static
+from adminpanel.storage import IMMUTABLE_MEDIA_RE
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -28,5 +29,13 @@ urlpatterns = [
 ]
 
 if settings.DEBUG:
-    # Serve media files during development
+    # Serve media files during development; content-addressed product images
+    # (see adminpanel.storage) never change, so they may be cached forever.
+    # In production the web server should send the same headers for these paths.
+    urlpatterns += [
+        re_path(
+            r"^%s(?P<path>%s)" % (settings.MEDIA_URL.lstrip("/"), IMMUTABLE_MEDIA_RE.pattern.lstrip("^")),
+            views.immutable_media,
+        ),
+    ]
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
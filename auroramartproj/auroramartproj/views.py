@@ -1,4 +1,16 @@
+from django.conf import settings
 from django.shortcuts import render
+from django.utils.cache import patch_cache_control
+from django.views.static import serve
+
+# One year, the conventional ceiling for "cache forever".
+IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
 
 def index(request):
     return render(request, 'index.html')
+
+def immutable_media(request, path):
+    """Serve a content-addressed media file with far-future cache headers (development server)."""
+    response = serve(request, path, document_root=settings.MEDIA_ROOT)
+    patch_cache_control(response, public=True, max_age=IMMUTABLE_MAX_AGE, immutable=True)
+    return response
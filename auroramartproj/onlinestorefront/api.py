@@ -0,0 +1,168 @@
+"""Read-only JSON API over the product catalog.
+
+Endpoints (all GET, no authentication; only staff see Inactive products):
+  api/products/                 list; filters ``category``, ``subcategory``,
+                                ``status`` (``Active`` by default, or
+                                ``Inactive``/``all`` for staff); cursor
+                                pagination with ``after=<id>`` and ``limit``
+                                (max API_MAX_LIMIT)
+  api/products/<id>/            one product by id
+  api/products/sku/<sku>/       one product by SKU
+  api/feed/                     streaming export of all active products;
+                                ``format`` (``ndjson``/``csv``), ``since``
+                                (ISO date/datetime of last modification; also
+                                lists deactivated products as tombstones);
+                                gzipped when the client accepts it
+
+Rows are read with ``values()`` over just the returned columns and written as
+compact JSON, so no model instances or templates are involved. Responses carry
+an ETag: per product for lookups by id, catalog-wide otherwise.
+"""
+import hashlib
+
+from django.core.files.storage import default_storage
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.cache import patch_vary_headers
+from django.views.decorators.http import condition, require_GET
+
+from adminpanel.catalog import get_catalog_last_modified, get_product_versions
+from adminpanel.models import Product
+
+from . import feeds
+
+API_DEFAULT_LIMIT = 50
+API_MAX_LIMIT = 200
+
+API_FIELDS = (
+    "id",
+    "sku_code",
+    "product_name",
+    "product_description",
+    "product_category",
+    "product_subcategory",
+    "quantity_on_hand",
+    "unit_price",
+    "status",
+    "image",
+)
+
+_STATUS_VALUES = {value for value, _ in Product.STATUS_CHOICES}
+_JSON_PARAMS = {"separators": (",", ":")}
+
+
+def _api_response(data, status=200):
+    return JsonResponse(data, status=status, json_dumps_params=_JSON_PARAMS)
+
+
+def _not_found():
+    return _api_response({"error": "not found"}, status=404)
+
+
+def _is_staff(request):
+    user = getattr(request, "user", None)
+    return bool(user and user.is_authenticated and (user.is_staff or user.is_superuser))
+
+
+def _visible_products(request):
+    """Products the requester may read: everything for staff, else Active only."""
+    qs = Product.objects.all()
+    return qs if _is_staff(request) else qs.filter(status='Active')
+
+
+def _serialize(row):
+    image = row["image"]
+    return dict(row, image=default_storage.url(image) if image else None)
+
+
+def _catalog_etag(request, *args, **kwargs):
+    return hashlib.md5(get_catalog_last_modified().isoformat().encode()).hexdigest()
+
+
+def _product_etag(request, pk):
+    # Only stamp products that exist (and are visible): get_product_versions
+    # stores a stamp for every id it is asked about.
+    if not _visible_products(request).filter(pk=pk).exists():
+        return None
+    return hashlib.md5(f"product:{pk}:{get_product_versions([pk])[pk]}".encode()).hexdigest()
+
+
+def _int_param(value, default):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+@require_GET
+@condition(etag_func=_catalog_etag)
+def product_list(request):
+    params = request.GET
+    qs = Product.objects.all()
+
+    status = params.get("status", "Active")
+    if status != "all":
+        if status not in _STATUS_VALUES:
+            return _api_response({"error": "status must be one of Active, Inactive, all"}, status=400)
+        qs = qs.filter(status=status)
+    if status != "Active" and not _is_staff(request):
+        return _api_response({"error": "only staff may list inactive products"}, status=403)
+    if params.get("category"):
+        qs = qs.filter(product_category=params["category"])
+    if params.get("subcategory"):
+        qs = qs.filter(product_subcategory=params["subcategory"])
+
+    limit = min(max(_int_param(params.get("limit"), API_DEFAULT_LIMIT), 1), API_MAX_LIMIT)
+    after = max(_int_param(params.get("after"), 0), 0)
+
+    rows = list(qs.filter(pk__gt=after).order_by("pk").values(*API_FIELDS)[: limit + 1])
+    next_url = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        query = params.copy()
+        query["after"] = rows[-1]["id"]
+        next_url = request.build_absolute_uri(f"{request.path}?{query.urlencode()}")
+
+    return _api_response({"results": [_serialize(row) for row in rows], "next": next_url})
+
+
+@require_GET
+@condition(etag_func=_product_etag)
+def product_detail(request, pk):
+    row = _visible_products(request).filter(pk=pk).values(*API_FIELDS).first()
+    if row is None:
+        return _not_found()
+    return _api_response(_serialize(row))
+
+
+@require_GET
+@condition(etag_func=_catalog_etag)
+def product_by_sku(request, sku):
+    row = _visible_products(request).filter(sku_code=sku).order_by("pk").values(*API_FIELDS).first()
+    if row is None:
+        return _not_found()
+    return _api_response(_serialize(row))
+
+
+@require_GET
+def catalog_feed(request):
+    fmt = request.GET.get("format", "ndjson")
+    if fmt not in feeds.FEED_FORMATS:
+        return _api_response({"error": "format must be one of ndjson, csv"}, status=400)
+    try:
+        since = feeds.parse_since(request.GET.get("since"))
+    except ValueError:
+        return _api_response({"error": "since must be an ISO date or datetime"}, status=400)
+
+    compress = feeds.accepts_gzip(request.headers.get("Accept-Encoding"))
+    # Under ASGI a sync iterator would be collected into memory before sending.
+    chunks = feeds.afeed_chunks if isinstance(request, ASGIRequest) else feeds.feed_chunks
+    response = StreamingHttpResponse(
+        chunks(fmt, since=since, compress=compress),
+        content_type=feeds.CONTENT_TYPES[fmt],
+    )
+    if compress:
+        response["Content-Encoding"] = "gzip"
+    patch_vary_headers(response, ("Accept-Encoding",))
+    response["Content-Disposition"] = f'inline; filename="catalog.{fmt}"'
+    return response
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class OnlinestorefrontConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'onlinestorefront'
+
+    def ready(self):
+        # Keep the product search index in sync with Product writes.
+        from . import signals  # noqa: F401
@@ -0,0 +1,184 @@
+"""Cached, catalog-version-scoped lookups used by the storefront views.
+
+Every key is built with ``adminpanel.catalog.catalog_cache_key`` so entries are
+rebuilt automatically after any Product change bumps the catalog version;
+the active id arrays live in process memory under the same version instead.
+The ``a``-prefixed helpers are async versions for the async storefront views;
+cache reads stay synchronous since the cache backend is local files. Full
+pages are stored in the separate ``pages`` cache.
+"""
+import hashlib
+import random
+import threading
+from array import array
+
+from django.core.cache import cache, caches
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+
+from adminpanel.catalog import catalog_cache_key, get_catalog_version, get_product_versions
+from adminpanel.models import Product
+
+from .facets import afacet_counts, facet_counts
+
+CATALOG_CACHE_TIMEOUT = 60 * 60
+
+
+# Per-worker id arrays for sample_active_products, keyed by category ("" for
+# all). Kept in process memory like the suggest/trigram indexes: the Django
+# cache would unpickle the whole list on every read.
+_active_ids_lock = threading.Lock()
+_active_ids = {}
+_active_ids_version = None
+
+
+def active_product_ids(category=""):
+    """Return the ids of all active products, optionally within one category."""
+    global _active_ids, _active_ids_version
+    category = category or ""
+    version = get_catalog_version()
+    ids = _active_ids.get(category) if _active_ids_version == version else None
+    if ids is None:
+        qs = Product.objects.filter(status='Active')
+        if category:
+            qs = qs.filter(product_category=category)
+        ids = array("q", qs.order_by("id").values_list("id", flat=True).iterator(chunk_size=2000))
+        with _active_ids_lock:
+            if _active_ids_version != version:
+                _active_ids, _active_ids_version = {}, version
+            _active_ids[category] = ids
+    return ids
+
+
+def sample_active_products(category="", k=20):
+    """Return up to `k` random active products using one primary-key query.
+
+    Ids are drawn in memory from this worker's id array, so the cost does not
+    depend on catalog size the way ``order_by("?")`` does.
+    """
+    ids = active_product_ids(category)
+    if not ids:
+        return []
+    chosen = random.sample(ids, min(k, len(ids)))
+    # Re-check status in case the id list predates a very recent change.
+    found = Product.objects.filter(status='Active').in_bulk(chosen)
+    return [found[pk] for pk in chosen if pk in found]
+
+
+def _strip_rows(category, per_subcategory):
+    return (
+        Product.objects.filter(product_category=category, status='Active')
+        .exclude(product_subcategory__isnull=True)
+        .exclude(product_subcategory="")
+        .annotate(
+            row_number=Window(
+                RowNumber(),
+                partition_by=[F("product_subcategory")],
+                order_by=F("id").asc(),
+            )
+        )
+        .filter(row_number__lte=per_subcategory)
+        .order_by("id")
+    )
+
+
+def _group_strips(products):
+    grouped = {}
+    for product in products:
+        grouped.setdefault(product.product_subcategory, []).append(product)
+    return [{"name": name, "products": items} for name, items in grouped.items()]
+
+
+def subcategory_strips(category, per_subcategory=4):
+    """Return ``[{"name": sub, "products": [...]}, ...]`` for a category.
+
+    The first `per_subcategory` active products (by id) of every subcategory
+    come from a single ROW_NUMBER() query; subcategories keep the order in
+    which they first appear in the catalog.
+    """
+    key = catalog_cache_key("subcategory_strips", category, per_subcategory)
+    strips = cache.get(key)
+    if strips is None:
+        strips = _group_strips(_strip_rows(category, per_subcategory))
+        cache.set(key, strips, CATALOG_CACHE_TIMEOUT)
+    return strips
+
+
+async def asubcategory_strips(category, per_subcategory=4):
+    """Async version of subcategory_strips()."""
+    key = catalog_cache_key("subcategory_strips", category, per_subcategory)
+    strips = cache.get(key)
+    if strips is None:
+        strips = _group_strips([p async for p in _strip_rows(category, per_subcategory)])
+        cache.set(key, strips, CATALOG_CACHE_TIMEOUT)
+    return strips
+
+
+def _listing_queryset(category, subcategory):
+    qs = Product.objects.filter(product_category=category, status='Active')
+    if subcategory:
+        qs = qs.filter(product_subcategory=subcategory)
+    return qs
+
+
+def listing_facet_counts(category, subcategory=""):
+    """Facet counts for the active products of a category (or subcategory)."""
+    key = catalog_cache_key("facet_counts", category, subcategory or "*")
+    counts = cache.get(key)
+    if counts is None:
+        counts = facet_counts(_listing_queryset(category, subcategory))
+        cache.set(key, counts, CATALOG_CACHE_TIMEOUT)
+    return counts
+
+
+async def alisting_facet_counts(category, subcategory=""):
+    """Async version of listing_facet_counts()."""
+    key = catalog_cache_key("facet_counts", category, subcategory or "*")
+    counts = cache.get(key)
+    if counts is None:
+        counts = await afacet_counts(_listing_queryset(category, subcategory))
+        cache.set(key, counts, CATALOG_CACHE_TIMEOUT)
+    return counts
+
+
+PRODUCT_FRAGMENT_KEY = "storefront:product_fragment:{}"
+
+
+def get_product_fragment(pk):
+    """Return the cached product page fragment for `pk`, or None if stale/missing.
+
+    An entry records the version stamp of every product it was rendered
+    from (the product and its recommendations); it is only served while all
+    of those stamps are unchanged.
+    """
+    entry = cache.get(PRODUCT_FRAGMENT_KEY.format(pk))
+    if entry is None:
+        return None
+    if get_product_versions(entry["deps"]) != entry["deps"]:
+        return None
+    return entry
+
+
+def set_product_fragment(pk, deps, **payload):
+    """Cache a rendered product fragment along with its dependency stamps.
+
+    `deps` is ``{pk: version}`` for the product and its recommendations, as
+    read with get_product_versions() *before* they were queried; stamps read
+    afterwards could postdate a change the fragment does not include.
+    """
+    entry = dict(payload, deps=deps)
+    cache.set(PRODUCT_FRAGMENT_KEY.format(pk), entry, CATALOG_CACHE_TIMEOUT)
+    return entry
+
+
+def _page_key(url):
+    return catalog_cache_key("page", hashlib.md5(url.encode()).hexdigest())
+
+
+def get_page(url):
+    """Return the cached anonymous (content, content_type) for a normalised URL, or None."""
+    return caches["pages"].get(_page_key(url))
+
+
+def set_page(url, content, content_type):
+    caches["pages"].set(_page_key(url), (content, content_type), CATALOG_CACHE_TIMEOUT)
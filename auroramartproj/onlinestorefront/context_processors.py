@@ -1,46 +1,111 @@
+from django.core.cache import cache
+from django.db import transaction
+
+from adminpanel.catalog import catalog_cache_key
 from adminpanel.models import Product
-from .models import Cart
 
+# Category trees are keyed by catalog version, so old entries simply age out.
+CATEGORY_TREE_TIMEOUT = 60 * 60
 
-def categories_processor(request):
-    """Provide categories and their subcategories for the header dropdown.
 
-    Returns a list of dicts: { 'name': category_name, 'subcategories': [sub1, sub2, ...] }
-    """
-    # Collect distinct category names
-    category_names = (
+def _category_pairs():
+    return (
         Product.objects.exclude(product_category__isnull=True)
         .exclude(product_category="")
-        .values_list("product_category", flat=True)
+        .values_list("product_category", "product_subcategory")
         .distinct()
     )
-    categories = []
-    for cname in category_names:
-        subs_qs = (
-            Product.objects.filter(product_category=cname)
-            .exclude(product_subcategory__isnull=True)
-            .exclude(product_subcategory="")
-            .values_list("product_subcategory", flat=True)
-            .distinct()
-        )
-        # sort subcategories alphabetically (case-insensitive)
-        sub_list = sorted(list(subs_qs), key=lambda s: (s or '').lower())
-        categories.append({"name": cname, "subcategories": sub_list})
 
-    # sort categories alphabetically (case-insensitive)
-    categories = sorted(categories, key=lambda c: (c.get('name') or '').lower())
 
-    return {"site_categories": categories}
+def _tree_from_pairs(pairs):
+    tree = {}
+    for cname, sname in pairs:
+        subs = tree.setdefault(cname, set())
+        if sname:
+            subs.add(sname)
+
+    # sort categories and subcategories alphabetically (case-insensitive)
+    categories = [
+        {"name": cname, "subcategories": sorted(subs, key=lambda s: (s or '').lower())}
+        for cname, subs in tree.items()
+    ]
+    return sorted(categories, key=lambda c: (c.get('name') or '').lower())
+
+
+def build_category_tree():
+    """Build the category/subcategory tree from a single grouped query.
+
+    Returns a list of dicts: { 'name': category_name, 'subcategories': [sub1, sub2, ...] }
+    """
+    return _tree_from_pairs(_category_pairs())
+
+
+def get_category_tree():
+    """Return the cached category tree for the current catalog version."""
+    key = catalog_cache_key("category_tree")
+    categories = cache.get(key)
+    if categories is None:
+        categories = build_category_tree()
+        cache.set(key, categories, CATEGORY_TREE_TIMEOUT)
+    return categories
+
+
+async def aget_category_tree():
+    """Async version of get_category_tree(); warms the cache for the header."""
+    key = catalog_cache_key("category_tree")
+    categories = cache.get(key)
+    if categories is None:
+        categories = _tree_from_pairs([pair async for pair in _category_pairs()])
+        cache.set(key, categories, CATEGORY_TREE_TIMEOUT)
+    return categories
+
+
+def categories_processor(request):
+    """Provide categories and their subcategories for the header dropdown."""
+    return {"site_categories": get_category_tree()}
+
+
+# Cache key holding a shopper's header badge count. It is keyed by user, not
+# session, so every session of the account sees a write from any of them.
+CART_COUNT_KEY = "cart:count:{}"
+CART_COUNT_TIMEOUT = 60 * 60 * 24
+
+
+def cached_cart_count(user_id):
+    """Return the cached badge count for `user_id`, or None if not cached."""
+    return cache.get(CART_COUNT_KEY.format(user_id))
+
+
+def remember_cart_count(request, count):
+    """Record the latest cart badge count for the requesting user.
+
+    The current request sees it at once; the shared copy is written when the
+    surrounding transaction commits, so a rolled-back change never shows.
+    """
+    user = getattr(request, "user", None)
+    if not (user and user.is_authenticated):
+        return
+    request.cart_item_count = count
+    key = CART_COUNT_KEY.format(user.pk)
+    transaction.on_commit(lambda: cache.set(key, count, CART_COUNT_TIMEOUT))
 
 
 def cart_count_processor(request):
-    """Expose cart_item_count for header badge. Safe if no cart or anon."""
+    """Expose cart_item_count for header badge. Safe if no cart or anon.
+
+    Reads the per-user cached count first, so rendering the badge needs no
+    query once it has been loaded; falls back to the denormalized
+    Cart.item_count of request.cart (shared with the view, see
+    CustomerCartMiddleware).
+    """
     count = 0
     user = getattr(request, "user", None)
     if user and user.is_authenticated:
-        try:
-            cart = Cart.objects.get(user=user)
-            count = cart.items.count()
-        except Cart.DoesNotExist:
-            count = 0
+        count = getattr(request, "cart_item_count", None)
+        if count is None:
+            count = cached_cart_count(user.pk)
+        if count is None:
+            cart = getattr(request, "cart", None)
+            count = cart.item_count if cart else 0
+            remember_cart_count(request, count)
     return {"cart_item_count": count}
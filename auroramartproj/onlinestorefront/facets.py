@@ -0,0 +1,161 @@
+"""Facet filters and counts for storefront product listings.
+
+Facets are selected with query string parameters:
+  cat       product category
+  sub       product subcategory
+  price     price band key from PRICE_BUCKETS (e.g. ``25-50``)
+  in_stock  ``1`` to only show products with stock on hand
+
+All counts come from one GROUP BY over (category, subcategory, price band,
+in-stock) for the matched set, rolled up per facet in Python.
+"""
+from urllib.parse import urlencode
+
+from django.db.models import Case, Count, IntegerField, Value, When
+
+# (key, label, lower bound inclusive, upper bound exclusive or None)
+PRICE_BUCKETS = (
+    ("0-25", "Under $25", 0, 25),
+    ("25-50", "$25 to $50", 25, 50),
+    ("50-100", "$50 to $100", 50, 100),
+    ("100-250", "$100 to $250", 100, 250),
+    ("250-", "$250 & above", 250, None),
+)
+_BUCKETS_BY_KEY = {b[0]: b for b in PRICE_BUCKETS}
+
+FACET_PARAMS = ("cat", "sub", "price", "in_stock")
+
+
+def parse_facets(params):
+    """Return the valid facet selections found in `params` (a QueryDict)."""
+    selected = {}
+    for key in ("cat", "sub"):
+        value = (params.get(key) or "").strip()
+        if value:
+            selected[key] = value
+    price = params.get("price")
+    if price in _BUCKETS_BY_KEY:
+        selected["price"] = price
+    if params.get("in_stock") == "1":
+        selected["in_stock"] = "1"
+    return selected
+
+
+def apply_facets(qs, selected):
+    """Filter a Product queryset by the selected facets."""
+    if "cat" in selected:
+        qs = qs.filter(product_category=selected["cat"])
+    if "sub" in selected:
+        qs = qs.filter(product_subcategory=selected["sub"])
+    if "price" in selected:
+        _, _, low, high = _BUCKETS_BY_KEY[selected["price"]]
+        qs = qs.filter(unit_price__gte=low)
+        if high is not None:
+            qs = qs.filter(unit_price__lt=high)
+    if "in_stock" in selected:
+        qs = qs.filter(quantity_on_hand__gt=0)
+    return qs
+
+
+def _price_bucket_expression():
+    whens = []
+    for index, (_, _, low, high) in enumerate(PRICE_BUCKETS):
+        cond = {"unit_price__gte": low}
+        if high is not None:
+            cond["unit_price__lt"] = high
+        whens.append(When(then=Value(index), **cond))
+    return Case(*whens, default=Value(-1), output_field=IntegerField())
+
+
+def _facet_rows(qs):
+    return (
+        qs.order_by()
+        .annotate(
+            price_bucket=_price_bucket_expression(),
+            in_stock=Case(When(quantity_on_hand__gt=0, then=Value(1)), default=Value(0), output_field=IntegerField()),
+        )
+        .values("product_category", "product_subcategory", "price_bucket", "in_stock")
+        .annotate(n=Count("id"))
+    )
+
+
+def _roll_up(rows):
+    counts = {"total": 0, "in_stock": 0, "categories": {}, "subcategories": {}, "price": {}}
+    for row in rows:
+        n = row["n"]
+        counts["total"] += n
+        if row["in_stock"]:
+            counts["in_stock"] += n
+        cat = row["product_category"]
+        sub = row["product_subcategory"]
+        counts["categories"][cat] = counts["categories"].get(cat, 0) + n
+        if sub:
+            counts["subcategories"][sub] = counts["subcategories"].get(sub, 0) + n
+        if row["price_bucket"] >= 0:
+            key = PRICE_BUCKETS[row["price_bucket"]][0]
+            counts["price"][key] = counts["price"].get(key, 0) + n
+    return counts
+
+
+def facet_counts(qs):
+    """Count the matched set per category, subcategory, price band and stock.
+
+    Returns {"total", "in_stock", "categories": {name: n},
+    "subcategories": {name: n}, "price": {bucket_key: n}}.
+    """
+    return _roll_up(_facet_rows(qs))
+
+
+async def afacet_counts(qs):
+    """Async version of facet_counts()."""
+    return _roll_up([row async for row in _facet_rows(qs)])
+
+
+def facet_querystring(params, **changes):
+    """Query string (with trailing ``&`` when non-empty) for links that keep facets.
+
+    Carries ``q`` and the facet parameters from `params`, applies `changes`
+    (a value of None removes the key) and drops any pagination cursor.
+    """
+    keep = {}
+    for key in ("q",) + FACET_PARAMS:
+        value = params.get(key)
+        if value:
+            keep[key] = value
+    for key, value in changes.items():
+        if value is None:
+            keep.pop(key, None)
+        else:
+            keep[key] = value
+    encoded = urlencode(keep)
+    return f"{encoded}&" if encoded else ""
+
+
+def facet_groups(params, counts, selected, include=FACET_PARAMS):
+    """Build template-ready facet groups with counts and toggle links."""
+    def option(key, value, label, count):
+        is_selected = selected.get(key) == value
+        qs = facet_querystring(params, **{key: None if is_selected else value})
+        return {"label": label, "count": count, "selected": is_selected, "url": "?" + qs.rstrip("&")}
+
+    groups = []
+    if "cat" in include and counts["categories"]:
+        groups.append({"title": "Category", "options": [
+            option("cat", name, name, n)
+            for name, n in sorted(counts["categories"].items(), key=lambda kv: kv[0].lower())
+        ]})
+    if "sub" in include and counts["subcategories"]:
+        groups.append({"title": "Subcategory", "options": [
+            option("sub", name, name, n)
+            for name, n in sorted(counts["subcategories"].items(), key=lambda kv: kv[0].lower())
+        ]})
+    if "price" in include and counts["price"]:
+        groups.append({"title": "Price", "options": [
+            option("price", key, label, counts["price"][key])
+            for key, label, _, _ in PRICE_BUCKETS if counts["price"].get(key)
+        ]})
+    if "in_stock" in include and counts["in_stock"]:
+        groups.append({"title": "Availability", "options": [
+            option("in_stock", "1", "In stock", counts["in_stock"]),
+        ]})
+    return groups
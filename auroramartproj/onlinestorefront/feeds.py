@@ -0,0 +1,198 @@
+"""Streaming full-catalog feed export (NDJSON or CSV).
+
+Rows are read with ``.values(...).iterator(chunk_size=FEED_CHUNK_SIZE)``
+and encoded one line at a time, optionally through an incremental gzip
+compressor, so memory use does not grow with the size of the catalog. Used by
+the ``api/feed/`` endpoint (``afeed_chunks`` under ASGI) and the
+``export_catalog_feed`` command.
+"""
+import csv
+import datetime
+import io
+import json
+import zlib
+
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from adminpanel.models import Product
+
+FEED_FORMATS = ("ndjson", "csv")
+FEED_CHUNK_SIZE = 2000
+# Target size of the blocks afeed_chunks() sends.
+FEED_BLOCK_SIZE = 64 * 1024
+
+FEED_FIELDS = (
+    "id",
+    "sku_code",
+    "status",
+    "product_name",
+    "product_description",
+    "product_category",
+    "product_subcategory",
+    "quantity_on_hand",
+    "unit_price",
+    "image",
+    "updated_at",
+)
+
+# Columns kept for products that are no longer Active. Incremental (``since``)
+# feeds include them as tombstones so consumers can drop those products.
+TOMBSTONE_FIELDS = ("id", "sku_code", "status", "updated_at")
+
+CONTENT_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def accepts_gzip(accept_encoding):
+    """Return whether an Accept-Encoding header allows gzip, honouring q-values."""
+    qualities = {}
+    for token in (accept_encoding or "").split(","):
+        coding, _, params = token.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding] = quality
+    return qualities.get("gzip", qualities.get("x-gzip", qualities.get("*", 0.0))) > 0
+
+
+def parse_since(value):
+    """Parse a ``since`` value (ISO datetime or date) into an aware datetime.
+
+    Returns None for an empty value and raises ValueError for bad input.
+    """
+    if not value:
+        return None
+    since = parse_datetime(value)
+    if since is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f"Invalid since value: {value!r}")
+        since = datetime.datetime.combine(day, datetime.time.min)
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since)
+    return since
+
+
+def _feed_queryset(since):
+    if since is None:
+        qs = Product.objects.filter(status='Active')
+    else:
+        # Also products deactivated since then, emitted as tombstones.
+        qs = Product.objects.filter(updated_at__gte=since)
+    # values() rather than values_list(): its iterable is a generator, so
+    # aiterator() runs the query in a worker thread instead of on the event loop.
+    return qs.order_by("pk").values(*FEED_FIELDS)
+
+
+def _feed_row(row):
+    if row["status"] != 'Active':
+        row = {field: row[field] if field in TOMBSTONE_FIELDS else None for field in FEED_FIELDS}
+        row["updated_at"] = row["updated_at"].isoformat()
+        return row
+    row["image"] = default_storage.url(row["image"]) if row["image"] else ""
+    row["updated_at"] = row["updated_at"].isoformat()
+    return row
+
+
+def feed_rows(since=None, chunk_size=FEED_CHUNK_SIZE):
+    """Yield products as dicts, oldest id first, without caching the queryset.
+
+    A full feed has the active products only; with `since` it also has
+    tombstones for products deactivated since then.
+    """
+    for row in _feed_queryset(since).iterator(chunk_size=chunk_size):
+        yield _feed_row(row)
+
+
+def ndjson_lines(rows):
+    for row in rows:
+        yield json.dumps(row, separators=(",", ":")) + "\n"
+
+
+def csv_lines(rows):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=FEED_FIELDS)
+    writer.writeheader()
+    yield buffer.getvalue()
+    for row in rows:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerow(row)
+        yield buffer.getvalue()
+
+
+def gzip_chunks(chunks):
+    """Compress an iterable of bytes into a gzip stream on the fly."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def feed_chunks(fmt, since=None, compress=False):
+    """Yield the encoded feed as bytes in `fmt` (one of FEED_FORMATS)."""
+    lines = ndjson_lines if fmt == "ndjson" else csv_lines
+    chunks = (line.encode("utf-8") for line in lines(feed_rows(since)))
+    return gzip_chunks(chunks) if compress else chunks
+
+
+async def afeed_chunks(fmt, since=None, compress=False, chunk_size=FEED_CHUNK_SIZE):
+    """Async version of feed_chunks(), for serving the feed under ASGI.
+
+    Django buffers a synchronous streaming iterator into a list before sending
+    it under ASGI, so the endpoint streams this one instead. Rows are read with
+    ``aiterator()`` and written out in blocks of about FEED_BLOCK_SIZE bytes.
+    """
+    async def rows():
+        async for row in _feed_queryset(since).aiterator(chunk_size=chunk_size):
+            yield _feed_row(row)
+
+    compressor = zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS | 16) if compress else None
+    pending = []
+    pending_size = 0
+
+    def encode(text):
+        data = text.encode("utf-8")
+        return compressor.compress(data) if compressor else data
+
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=FEED_FIELDS)
+        writer.writeheader()
+
+        def line(row):
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerow(row)
+            return buffer.getvalue()
+
+        pending.append(encode(buffer.getvalue()))
+    else:
+        def line(row):
+            return json.dumps(row, separators=(",", ":")) + "\n"
+
+    async for row in rows():
+        data = encode(line(row))
+        if data:
+            pending.append(data)
+            pending_size += len(data)
+        if pending_size >= FEED_BLOCK_SIZE:
+            yield b"".join(pending)
+            pending, pending_size = [], 0
+    if compressor:
+        pending.append(compressor.flush())
+    yield b"".join(pending)
@@ -1,5 +1,6 @@
 from django import forms
-from .models import Customer
+from django.db import transaction
+from .models import Customer, create_shopper_records
 from datetime import datetime
 from django.contrib.auth.models import User
 from django.contrib.auth.forms import UserCreationForm
@@ -28,7 +29,9 @@ class BasicRegisterForm(UserCreationForm):
         user.last_name = self.cleaned_data.get("last_name")
 
         if commit:
-            user.save()
+            with transaction.atomic():
+                user.save()
+                create_shopper_records(user)
         return user
 
 class CustomerProfileForm(forms.ModelForm):
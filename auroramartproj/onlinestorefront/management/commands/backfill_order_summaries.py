@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Prefetch
+
+from onlinestorefront.models import Order, OrderItems
+
+BATCH_SIZE = 500
+
+
+class Command(BaseCommand):
+    help = "Fill Order.item_count, unit_count and item_preview from the order lines of existing orders."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Recompute every order, not only those without a summary yet.",
+        )
+
+    def handle(self, *args, **options):
+        orders = Order.objects.order_by("pk")
+        if not options["all"]:
+            orders = orders.filter(item_count=0)
+        lines = OrderItems.objects.select_related("product").order_by("pk")
+
+        updated = 0
+        last_pk = 0
+        while True:
+            batch = list(
+                orders.filter(pk__gt=last_pk)
+                .only("pk")
+                .prefetch_related(Prefetch("order_items", queryset=lines))[:BATCH_SIZE]
+            )
+            if not batch:
+                break
+            for order in batch:
+                order.set_summary(
+                    (it.product, it.quantity, it.price_at_purchase) for it in order.order_items.all()
+                )
+            with transaction.atomic():
+                Order.objects.bulk_update(batch, ["item_count", "unit_count", "item_preview"])
+            updated += len(batch)
+            last_pk = batch[-1].pk
+
+        self.stdout.write(self.style.SUCCESS(f"Updated the summary of {updated} order(s)."))
@@ -0,0 +1,26 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from onlinestorefront.models import Cart, Customer
+
+
+class Command(BaseCommand):
+    help = "Create the missing Customer and Cart rows of existing storefront (non-staff) users."
+
+    def handle(self, *args, **options):
+        shoppers = User.objects.filter(is_staff=False, is_superuser=False)
+        with transaction.atomic():
+            customers = [
+                Customer(user_id=pk)
+                for pk in shoppers.filter(profile__isnull=True).values_list("pk", flat=True)
+            ]
+            carts = [
+                Cart(user_id=pk)
+                for pk in shoppers.filter(cart__isnull=True).values_list("pk", flat=True)
+            ]
+            Customer.objects.bulk_create(customers, batch_size=500)
+            Cart.objects.bulk_create(carts, batch_size=500)
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {len(customers)} customer profile(s) and {len(carts)} cart(s)."
+        ))
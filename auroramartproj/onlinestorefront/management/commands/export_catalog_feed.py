@@ -0,0 +1,34 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from onlinestorefront import feeds
+
+
+class Command(BaseCommand):
+    help = "Stream the active product catalog as NDJSON or CSV to a file or stdout."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=feeds.FEED_FORMATS, default="ndjson")
+        parser.add_argument("--since", help="Only products modified at or after this ISO date/datetime "
+                                 "(deactivated ones are included as tombstones).")
+        parser.add_argument("--gzip", action="store_true", help="Gzip the output.")
+        parser.add_argument("--output", "-o", help="Output path (defaults to stdout).")
+
+    def handle(self, *args, **options):
+        try:
+            since = feeds.parse_since(options["since"])
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        chunks = feeds.feed_chunks(options["format"], since=since, compress=options["gzip"])
+        if options["output"]:
+            with open(options["output"], "wb") as out:
+                for chunk in chunks:
+                    out.write(chunk)
+            self.stderr.write(self.style.SUCCESS(f"Catalog feed written to {options['output']}."))
+        else:
+            out = sys.stdout.buffer
+            for chunk in chunks:
+                out.write(chunk)
+            out.flush()
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from onlinestorefront import search_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the SQLite FTS5 product search index from the Product table."
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite":
+            raise CommandError("The full-text search index requires SQLite with FTS5.")
+        search_index.rebuild()
+        self.stdout.write(self.style.SUCCESS("Product search index rebuilt."))
@@ -0,0 +1,47 @@
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.functional import SimpleLazyObject
+
+from .models import Cart, Customer
+
+
+def _shopper(request):
+    """The signed-in storefront customer user, or None (anonymous or staff)."""
+    user = getattr(request, "user", None)
+    if not (user and user.is_authenticated) or user.is_staff or user.is_superuser:
+        return None
+    return user
+
+
+# Customer and Cart rows are created at registration (create_shopper_records)
+# and backfilled with `manage.py backfill_shopper_records`, so these are plain
+# reads; get_or_create only writes for an account that slipped through both.
+
+def get_customer(request):
+    user = _shopper(request)
+    if user is None:
+        return None
+    customer, _ = Customer.objects.get_or_create(user=user)
+    return customer
+
+
+def get_cart(request):
+    user = _shopper(request)
+    if user is None:
+        return None
+    cart, _ = Cart.objects.get_or_create(user=user)
+    return cart
+
+
+class CustomerCartMiddleware(MiddlewareMixin):
+    """Expose the shopper's Customer and Cart as request.customer / request.cart.
+
+    Both are resolved lazily, at most once per request, and shared by the
+    views and context processors. They are None for anonymous visitors and
+    staff accounts. Must come after AuthenticationMiddleware. Setting the
+    lazy objects does no I/O, so the middleware runs natively under ASGI too
+    (async views must not evaluate them on the event loop).
+    """
+
+    def process_request(self, request):
+        request.customer = SimpleLazyObject(lambda: get_customer(request))
+        request.cart = SimpleLazyObject(lambda: get_cart(request))
@@ -0,0 +1,24 @@
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_item_count(apps, schema_editor):
+    Cart = apps.get_model('onlinestorefront', 'Cart')
+    for cart in Cart.objects.annotate(n=Count('items')).iterator():
+        Cart.objects.filter(pk=cart.pk).update(item_count=cart.n)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('onlinestorefront', '0011_alter_shippinginformation_contact_number'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cart',
+            name='item_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_item_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+from django.db import migrations
+
+# The DDL and backfill are spelled out here rather than imported from
+# onlinestorefront.search_index, so later changes to that module cannot
+# change what this migration does.
+CREATE_SQL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS product_fts USING fts5("
+    "product_name, product_description, product_category, product_subcategory, "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+)
+
+BACKFILL_SQL = (
+    "INSERT INTO product_fts(rowid, product_name, product_description, product_category, product_subcategory) "
+    "SELECT id, product_name, product_description, product_category, product_subcategory "
+    "FROM {table} WHERE status = 'Active'"
+)
+
+DROP_SQL = "DROP TABLE IF EXISTS product_fts"
+
+
+def create_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    Product = apps.get_model("adminpanel", "Product")
+    table = schema_editor.quote_name(Product._meta.db_table)
+    schema_editor.execute(DROP_SQL)
+    schema_editor.execute(CREATE_SQL)
+    schema_editor.execute(BACKFILL_SQL.format(table=table))
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute(DROP_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("adminpanel", "0005_product_listing_idx"),
+        ("onlinestorefront", "0012_cart_item_count"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -45,16 +45,76 @@ def _predict_with_dict(model, customer_data):
     return model.predict(df)
 
 
+# Metrics the rules index is pre-sorted on, and how many consequent sets are
+# kept per antecedent item for each metric. Lookups asking for more than
+# `_INDEX_TOP_K` rules fall back to scanning the DataFrame.
+_INDEX_METRICS = ("lift", "confidence", "support")
+_INDEX_TOP_K = 20
+
+
+def _build_rules_index(rules, metrics=_INDEX_METRICS, top_k=_INDEX_TOP_K):
+    """Compile a rules DataFrame into ``{metric: {item: [consequents, ...]}}``.
+
+    Each list holds the consequents of the top `top_k` rules whose antecedents
+    contain the item, ordered by `metric` descending (ties keep DataFrame
+    order). Returns None if `rules` is None or lacks the expected columns.
+    """
+    if rules is None:
+        return None
+    try:
+        antecedents = list(rules["antecedents"])
+        consequents = list(rules["consequents"])
+        scores = {m: list(rules[m]) for m in metrics if m in rules.columns}
+    except Exception:
+        return None
+
+    # Group rule positions by antecedent item once; every metric reuses them.
+    by_item = {}
+    for pos, ants in enumerate(antecedents):
+        try:
+            for item in ants:
+                by_item.setdefault(item, []).append(pos)
+        except TypeError:
+            continue
+
+    index = {}
+    for metric, values in scores.items():
+        metric_index = {}
+        for item, positions in by_item.items():
+            ranked = sorted(positions, key=lambda p: values[p], reverse=True)[:top_k]
+            metric_index[item] = [consequents[p] for p in ranked]
+        index[metric] = metric_index
+    return index
+
+
+_rules_index = _build_rules_index(loaded_rules)
+
+
 def get_recommendations(rules, items, metric='confidence', top_n=5):
     """Return up to `top_n` recommended item ids using the provided rules DataFrame.
 
     This follows the notebook implementation: filter rules where the given
     item is in the antecedents, sort by `metric`, and collect consequents.
+    For the module-level `loaded_rules` the pre-compiled index is used so a
+    lookup is a dict hit instead of a scan over every rule.
     If `rules` is None, return an empty list.
     """
     if rules is None:
         return []
 
+    index = _rules_index if rules is loaded_rules else None
+    if index is not None and metric in index and top_n <= _INDEX_TOP_K:
+        metric_index = index[metric]
+        recommendations = set()
+        for item in items:
+            for cons in metric_index.get(item, ())[:top_n]:
+                try:
+                    recommendations.update(cons)
+                except Exception:
+                    continue
+        recommendations.difference_update(items)
+        return list(recommendations)[:top_n]
+
     recommendations = set()
     for item in items:
         # rules DataFrame stores antecedents as iterable-like values
@@ -71,6 +131,21 @@ def get_recommendations(rules, items, metric='confidence', top_n=5):
     return list(recommendations)[:top_n]
 
 
+def get_recommendations_batch(rules, items, metric='confidence', top_n=5):
+    """Return ``{item: [recommended ids]}`` for every item in `items`.
+
+    Each entry matches ``get_recommendations(rules, [item], metric, top_n)``;
+    duplicate items are looked up once. If `rules` is None, every item maps
+    to an empty list.
+    """
+    results = {}
+    for item in items:
+        if item in results:
+            continue
+        results[item] = get_recommendations(rules, [item], metric=metric, top_n=top_n)
+    return results
+
+
 def predict_preferred_category(profile):
     if profile is None:
         return ""
@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models import F
+from django.db.models.functions import Greatest
 from django.contrib.auth.models import User
 
 # Create your models here.
@@ -46,6 +48,24 @@ class Cart(models.Model):
 	user = models.OneToOneField(User, on_delete=models.RESTRICT, related_name="cart")
 	created_at = models.DateTimeField(auto_now_add=True)
 	updated_at = models.DateTimeField(auto_now=True)
+	# Denormalized number of CartItem rows, shown on the header badge.
+	item_count = models.PositiveIntegerField(default=0)
+
+	def adjust_item_count(self, delta):
+		"""Atomically add `delta` to item_count (never below zero) and return the new value."""
+		Cart.objects.filter(pk=self.pk).update(item_count=Greatest(F("item_count") + delta, 0))
+		self.refresh_from_db(fields=["item_count"])
+		return self.item_count
+
+
+def create_shopper_records(user):
+	"""Create the Customer profile and Cart of a new storefront account.
+
+	Registration calls this in the same transaction as the User insert, so
+	storefront pages only ever read these rows.
+	"""
+	Customer.objects.create(user=user)
+	Cart.objects.create(user=user)
 
 
 class CartItem(models.Model):
@@ -54,6 +74,10 @@ class CartItem(models.Model):
 	quantity = models.PositiveIntegerField(default=1)
 
 
+# Number of order lines kept in Order.item_preview.
+ORDER_PREVIEW_ITEMS = 5
+
+
 class Order(models.Model):
 	STATUS = [
 		("pending", "Pending"),
@@ -84,6 +108,36 @@ class Order(models.Model):
 	shipping_country = models.CharField(max_length=100, blank=True)
 	shipping_contact_number = models.CharField(max_length=20, blank=True)
 
+	# Summary of the order lines, written with them at checkout so order lists
+	# never need to read OrderItems (see set_summary).
+	item_count = models.PositiveIntegerField(default=0)
+	unit_count = models.PositiveIntegerField(default=0)
+	item_preview = models.JSONField(default=list, blank=True)
+
+	class Meta:
+		indexes = [
+			# Order history pages seek on (created_at, id) newest first.
+			models.Index(fields=["customer", "-created_at", "-id"], name="order_customer_created_idx"),
+		]
+
+	def set_summary(self, lines):
+		"""Fill item_count, unit_count and item_preview from (product, quantity, price) lines.
+
+		The preview keeps the first ORDER_PREVIEW_ITEMS lines as
+		{"name", "qty", "unit"} dicts, with the unit price as a 2dp string.
+		"""
+		lines = list(lines)
+		self.item_count = len(lines)
+		self.unit_count = sum(int(qty) for _, qty, _ in lines)
+		self.item_preview = [
+			{"name": getattr(product, "product_name", "Item"), "qty": int(qty), "unit": f"{price:.2f}"}
+			for product, qty, price in lines[:ORDER_PREVIEW_ITEMS]
+		]
+
+	@property
+	def preview_remaining(self):
+		return max(0, self.item_count - len(self.item_preview))
+
 
 class OrderItems(models.Model):
     order = models.ForeignKey(Order, on_delete=models.RESTRICT, related_name="order_items")
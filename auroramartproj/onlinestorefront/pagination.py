@@ -0,0 +1,174 @@
+"""Keyset (seek) pagination for storefront product listings.
+
+Page-number pagination needs a COUNT(*) and an OFFSET scan that grows with
+the page depth. A keyset page instead seeks directly to ``id > after`` (or
+``id < before``) using the listing index, so every page costs the same.
+``datetime_keyset_page`` does the same for newest-first listings such as
+the order history, seeking on a (timestamp, id) pair.
+"""
+import datetime
+
+from django.db.models import Q
+
+_EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+class KeysetPage:
+    """A page of results addressed by id cursors instead of a page number.
+
+    Mirrors the parts of ``django.core.paginator.Page`` the templates use
+    (``object_list``, ``has_next``, ``has_previous``) and adds the cursors
+    for the neighbouring pages.
+    """
+
+    is_keyset = True
+
+    def __init__(self, object_list, has_next, has_previous):
+        self.object_list = object_list
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    @property
+    def next_cursor(self):
+        return self.object_list[-1].pk if self.object_list else None
+
+    @property
+    def previous_cursor(self):
+        return self.object_list[0].pk if self.object_list else None
+
+
+def _parse_cursor(value):
+    try:
+        cursor = int(value)
+    except (TypeError, ValueError):
+        return None
+    return cursor if cursor >= 0 else None
+
+
+def wants_keyset(params):
+    """True if the query string asks for cursor mode (``after`` or ``before``)."""
+    return "after" in params or "before" in params
+
+
+def keyset_page(queryset, params, per_page):
+    """Return the KeysetPage selected by ``after``/``before`` in `params`.
+
+    ``?after=<id>`` returns the `per_page` rows with the next larger ids;
+    ``?before=<id>`` the rows just below it. ``?after=0`` is the first page.
+    """
+    before = _parse_cursor(params.get("before"))
+    after = _parse_cursor(params.get("after"))
+
+    if before is not None:
+        rows = list(queryset.filter(pk__lt=before).order_by("-pk")[: per_page + 1])
+        has_previous = len(rows) > per_page
+        rows = rows[:per_page][::-1]
+        has_next = bool(rows) and queryset.filter(pk__gt=rows[-1].pk).exists()
+        return KeysetPage(rows, has_next=has_next, has_previous=has_previous)
+
+    after = after or 0
+    rows = list(queryset.filter(pk__gt=after).order_by("pk")[: per_page + 1])
+    has_next = len(rows) > per_page
+    rows = rows[:per_page]
+    has_previous = bool(rows) and queryset.filter(pk__lt=rows[0].pk).exists()
+    return KeysetPage(rows, has_next=has_next, has_previous=has_previous)
+
+
+async def akeyset_page(queryset, params, per_page):
+    """Async version of keyset_page()."""
+    before = _parse_cursor(params.get("before"))
+    after = _parse_cursor(params.get("after"))
+
+    if before is not None:
+        rows = [obj async for obj in queryset.filter(pk__lt=before).order_by("-pk")[: per_page + 1]]
+        has_previous = len(rows) > per_page
+        rows = rows[:per_page][::-1]
+        has_next = bool(rows) and await queryset.filter(pk__gt=rows[-1].pk).aexists()
+        return KeysetPage(rows, has_next=has_next, has_previous=has_previous)
+
+    after = after or 0
+    rows = [obj async for obj in queryset.filter(pk__gt=after).order_by("pk")[: per_page + 1]]
+    has_next = len(rows) > per_page
+    rows = rows[:per_page]
+    has_previous = bool(rows) and await queryset.filter(pk__lt=rows[0].pk).aexists()
+    return KeysetPage(rows, has_next=has_next, has_previous=has_previous)
+
+
+def encode_datetime_cursor(value, pk):
+    """Opaque ``<microseconds since epoch>_<pk>`` cursor for a (datetime, pk) pair."""
+    delta = value - _EPOCH
+    micros = (delta.days * 86400 + delta.seconds) * 10**6 + delta.microseconds
+    return f"{micros}_{pk}"
+
+
+def _parse_datetime_cursor(value):
+    try:
+        micros, pk = value.split("_")
+        return _EPOCH + datetime.timedelta(microseconds=int(micros)), int(pk)
+    except (AttributeError, ValueError, OverflowError):
+        return None
+
+
+class DatetimeKeysetPage(KeysetPage):
+    """KeysetPage whose cursors encode (`field`, pk) of the boundary rows."""
+
+    def __init__(self, object_list, has_next, has_previous, field):
+        super().__init__(object_list, has_next, has_previous)
+        self.field = field
+
+    @property
+    def next_cursor(self):
+        last = self.object_list[-1] if self.object_list else None
+        return encode_datetime_cursor(getattr(last, self.field), last.pk) if last else None
+
+    @property
+    def previous_cursor(self):
+        first = self.object_list[0] if self.object_list else None
+        return encode_datetime_cursor(getattr(first, self.field), first.pk) if first else None
+
+
+def datetime_keyset_page(queryset, params, per_page, field="created_at"):
+    """Return a newest-first DatetimeKeysetPage ordered by (`field`, pk) descending.
+
+    ``?after=<cursor>`` returns the next (older) `per_page` rows and
+    ``?before=<cursor>`` the newer rows just above it; no cursor is the first page.
+    """
+    def older(key):
+        return Q(**{f"{field}__lt": key[0]}) | Q(**{field: key[0], "pk__lt": key[1]})
+
+    def newer(key):
+        return Q(**{f"{field}__gt": key[0]}) | Q(**{field: key[0], "pk__gt": key[1]})
+
+    def key(obj):
+        return getattr(obj, field), obj.pk
+
+    before = _parse_datetime_cursor(params.get("before"))
+    after = _parse_datetime_cursor(params.get("after"))
+
+    if before is not None:
+        rows = list(queryset.filter(newer(before)).order_by(field, "pk")[: per_page + 1])
+        has_previous = len(rows) > per_page
+        rows = rows[:per_page][::-1]
+        has_next = bool(rows) and queryset.filter(older(key(rows[-1]))).exists()
+        return DatetimeKeysetPage(rows, has_next=has_next, has_previous=has_previous, field=field)
+
+    qs = queryset.order_by(f"-{field}", "-pk")
+    if after is not None:
+        qs = qs.filter(older(after))
+    rows = list(qs[: per_page + 1])
+    has_next = len(rows) > per_page
+    rows = rows[:per_page]
+    has_previous = after is not None and bool(rows) and queryset.filter(newer(key(rows[0]))).exists()
+    return DatetimeKeysetPage(rows, has_next=has_next, has_previous=has_previous, field=field)
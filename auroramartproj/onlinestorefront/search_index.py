@@ -0,0 +1,131 @@
+"""SQLite FTS5 full-text index over active products.
+
+The ``product_fts`` virtual table mirrors the searchable columns of every
+active ``Product`` (rowid = product id). It is kept in sync by the signal
+handlers in ``onlinestorefront.signals`` and can be rebuilt from scratch with
+``python manage.py rebuild_search_index``. On databases without FTS5 the
+storefront search falls back to ``icontains`` matching.
+"""
+import re
+
+from django.db import connection
+from django.db.models.expressions import RawSQL
+
+from adminpanel.models import Product
+
+FTS_TABLE = "product_fts"
+
+# BM25 column weights: name, description, category, subcategory.
+FTS_WEIGHTS = (10.0, 1.0, 4.0, 4.0)
+
+_FTS_COLUMNS = ("product_name", "product_description", "product_category", "product_subcategory")
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+CREATE_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    + ", ".join(_FTS_COLUMNS)
+    + ", tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+)
+DROP_SQL = f"DROP TABLE IF EXISTS {FTS_TABLE}"
+
+
+_fts_ready = set()
+
+
+def fts_supported(conn=None):
+    """True if the database is SQLite and the product_fts table exists."""
+    conn = conn or connection
+    if conn.vendor != "sqlite":
+        return False
+    if conn.alias in _fts_ready:
+        return True
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+        found = cursor.fetchone() is not None
+    if found:
+        _fts_ready.add(conn.alias)
+    return found
+
+
+def build_match_query(q):
+    """Turn free text into a safe FTS5 MATCH expression.
+
+    Every word becomes a quoted prefix term and all terms must match, so
+    operators typed by the shopper are never interpreted as FTS syntax.
+    """
+    tokens = _TOKEN_RE.findall(q or "")
+    return " ".join(f'"{t}"*' for t in tokens)
+
+
+def matching_products(queryset, q):
+    """Join a Product queryset to the FTS rows matching `q`.
+
+    The MATCH runs inside the queryset's own SQL, so further filters (e.g.
+    facets), counts and aggregates are applied by SQLite in the same query.
+    """
+    match = build_match_query(q)
+    if not match:
+        return queryset.none()
+    table = queryset.model._meta.db_table
+    return queryset.extra(
+        tables=[FTS_TABLE],
+        where=[f"{FTS_TABLE}.rowid = {table}.id", f"{FTS_TABLE} MATCH %s"],
+        params=[match],
+    )
+
+
+def order_by_rank(queryset):
+    """Order a matching_products() queryset by weighted BM25, best match first."""
+    weights = ", ".join(str(w) for w in FTS_WEIGHTS)
+    return queryset.annotate(fts_rank=RawSQL(f"bm25({FTS_TABLE}, {weights})", [])).order_by("fts_rank", "pk")
+
+
+def index_products(pks):
+    """Re-sync the given product ids: active rows are upserted, others removed."""
+    pks = list(pks)
+    if not pks or not fts_supported():
+        return
+    placeholders = ", ".join(["%s"] * len(_FTS_COLUMNS))
+    insert_sql = f"INSERT INTO {FTS_TABLE}(rowid, {', '.join(_FTS_COLUMNS)}) VALUES (%s, {placeholders})"
+    with connection.cursor() as cursor:
+        for chunk in _chunks(pks):
+            rows = Product.objects.filter(pk__in=chunk, status='Active').values_list("pk", *_FTS_COLUMNS)
+            _delete_rows(cursor, chunk)
+            cursor.executemany(insert_sql, list(rows))
+
+
+def remove_products(pks):
+    pks = list(pks)
+    if not pks or not fts_supported():
+        return
+    with connection.cursor() as cursor:
+        _delete_rows(cursor, pks)
+
+
+def rebuild(conn=None, product_table=None):
+    """Drop and repopulate the whole index from the Product table."""
+    conn = conn or connection
+    product_table = product_table or Product._meta.db_table
+    columns = ", ".join(_FTS_COLUMNS)
+    with conn.cursor() as cursor:
+        cursor.execute(DROP_SQL)
+        cursor.execute(CREATE_SQL)
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE}(rowid, {columns}) "
+            f"SELECT id, {columns} FROM {product_table} WHERE status = 'Active'"
+        )
+    _fts_ready.add(conn.alias)
+
+
+def _chunks(pks, size=500):
+    # Stay well below SQLite's bound-parameter limit.
+    for start in range(0, len(pks), size):
+        yield pks[start:start + size]
+
+
+def _delete_rows(cursor, pks):
+    for chunk in _chunks(pks):
+        cursor.execute(
+            f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({', '.join(['%s'] * len(chunk))})",
+            chunk,
+        )
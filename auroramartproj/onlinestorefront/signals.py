@@ -0,0 +1,23 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from adminpanel.catalog import products_changed
+from adminpanel.models import SEARCH_INDEXED_FIELDS, Product
+
+from . import search_index
+
+
+@receiver(post_save, sender=Product)
+def index_saved_product(sender, instance, **kwargs):
+    search_index.index_products([instance.pk])
+
+
+@receiver(post_delete, sender=Product)
+def unindex_deleted_product(sender, instance, **kwargs):
+    search_index.remove_products([instance.pk])
+
+
+@receiver(products_changed, sender=Product)
+def index_changed_products(sender, pks, fields=None, **kwargs):
+    if fields is None or not SEARCH_INDEXED_FIELDS.isdisjoint(fields):
+        search_index.index_products(pks)
@@ -0,0 +1,40 @@
+// Typeahead for the header search box: fills the input's <datalist> from the suggest endpoint.
+document.addEventListener('DOMContentLoaded', function () {
+    var input = document.querySelector('.store-search-input[data-suggest-url]');
+    if (!input) return;
+    var list = document.getElementById(input.getAttribute('list'));
+    if (!list) return;
+
+    var url = input.getAttribute('data-suggest-url');
+    var timer = null;
+    var lastQuery = '';
+
+    function render(suggestions) {
+        list.innerHTML = '';
+        suggestions.forEach(function (s) {
+            var opt = document.createElement('option');
+            opt.value = s.label;
+            list.appendChild(opt);
+        });
+    }
+
+    input.addEventListener('input', function () {
+        var q = input.value.trim();
+        clearTimeout(timer);
+        if (q.length < 2) {
+            render([]);
+            return;
+        }
+        timer = setTimeout(function () {
+            if (q === lastQuery) return;
+            lastQuery = q;
+            fetch(url + '?q=' + encodeURIComponent(q), { headers: { 'Accept': 'application/json' } })
+                .then(function (res) { return res.ok ? res.json() : { suggestions: [] }; })
+                .then(function (data) {
+                    // Ignore responses for queries the shopper has already typed past
+                    if (input.value.trim() === q) render(data.suggestions || []);
+                })
+                .catch(function () { /* suggestions are best-effort */ });
+        }, 120);
+    });
+});
@@ -0,0 +1,45 @@
+// Settings tabs: swap the panel for the tab's partial instead of reloading the whole page.
+document.addEventListener('DOMContentLoaded', function () {
+    var panel = document.getElementById('settings-panel');
+    var links = document.querySelectorAll('.settings-nav .settings-link[data-partial-url]');
+    if (!panel || !links.length) return;
+
+    function activate(tab) {
+        links.forEach(function (link) {
+            link.classList.toggle('active', link.getAttribute('data-tab') === tab);
+        });
+    }
+
+    function load(link, push) {
+        var tab = link.getAttribute('data-tab');
+        return fetch(link.getAttribute('data-partial-url'), { credentials: 'same-origin' })
+            .then(function (res) {
+                if (!res.ok) throw new Error(res.status);
+                return res.text();
+            })
+            .then(function (html) {
+                panel.innerHTML = html;
+                activate(tab);
+                if (push) history.pushState({ tab: tab }, '', link.href);
+            })
+            .catch(function () {
+                // Fall back to a full page load
+                window.location.href = link.href;
+            });
+    }
+
+    links.forEach(function (link) {
+        link.addEventListener('click', function (e) {
+            if (e.button !== 0 || e.metaKey || e.ctrlKey || e.shiftKey || e.altKey) return;
+            e.preventDefault();
+            if (link.classList.contains('active')) return;
+            load(link, true);
+        });
+    });
+
+    window.addEventListener('popstate', function () {
+        var tab = new URLSearchParams(window.location.search).get('tab') || 'account';
+        var link = document.querySelector('.settings-nav .settings-link[data-tab="' + tab + '"]');
+        if (link) load(link, false);
+    });
+});
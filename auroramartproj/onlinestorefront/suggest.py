@@ -0,0 +1,122 @@
+"""In-process prefix index behind the search box typeahead.
+
+Each worker builds sorted lists of lowercase keys (every word-start of the
+product names, categories and subcategories of active products, one list per
+kind) once, and rebuilds them only when the catalog version changes. A lookup
+is two bisects per kind, so suggestions never touch the database.
+"""
+import threading
+from bisect import bisect_left
+
+from adminpanel.catalog import get_catalog_version
+from adminpanel.models import Product
+
+SUGGEST_MIN_LENGTH = 2
+SUGGEST_LIMIT = 8
+
+# Suggestion kinds, in the order they are listed for the same prefix.
+KIND_CATEGORY = "category"
+KIND_SUBCATEGORY = "subcategory"
+KIND_PRODUCT = "product"
+_KIND_ORDER = {KIND_CATEGORY: 0, KIND_SUBCATEGORY: 1, KIND_PRODUCT: 2}
+
+
+class PrefixIndex:
+    """Sorted (key, entry) pairs per kind supporting prefix range lookups.
+
+    Each kind has its own sorted key list, so a lookup fills the limit with
+    categories first, then subcategories, then products, however many
+    product names share the prefix.
+    """
+
+    def __init__(self, entries):
+        # entries: iterable of (label, kind, url_args)
+        self.entries = []
+        keys = {kind: [] for kind in _KIND_ORDER}
+        seen = set()
+        for label, kind, args in entries:
+            if not label or (label, kind, args) in seen:
+                continue
+            seen.add((label, kind, args))
+            idx = len(self.entries)
+            self.entries.append((label, kind, args))
+            words = label.lower().split()
+            # Index every word start so "head" finds "Wireless Headphones".
+            for i in range(len(words)):
+                keys[kind].append((" ".join(words[i:]), idx))
+        self._keys = {}
+        self._ids = {}
+        for kind, pairs in keys.items():
+            pairs.sort()
+            self._keys[kind] = [k for k, _ in pairs]
+            self._ids[kind] = [i for _, i in pairs]
+
+    def lookup(self, prefix, limit=SUGGEST_LIMIT):
+        prefix = " ".join((prefix or "").lower().split())
+        if not prefix:
+            return []
+        found = []
+        for kind in sorted(_KIND_ORDER, key=_KIND_ORDER.get):
+            if len(found) >= limit:
+                break
+            keys, ids = self._keys[kind], self._ids[kind]
+            start = bisect_left(keys, prefix)
+            end = bisect_left(keys, prefix + "\uffff", lo=start)
+            bucket = []
+            seen = set()
+            for pos in range(start, end):
+                idx = ids[pos]
+                if idx in seen:
+                    continue
+                seen.add(idx)
+                bucket.append(self.entries[idx])
+                if len(found) + len(bucket) >= limit:
+                    break
+            bucket.sort(key=lambda e: len(e[0]))
+            found.extend(bucket)
+        return found
+
+
+def build_index():
+    entries = []
+    categories = set()
+    subcategories = set()
+    rows = (
+        Product.objects.filter(status='Active')
+        .values_list("id", "product_name", "product_category", "product_subcategory")
+        .order_by("id")
+    )
+    for pk, name, cat, sub in rows.iterator(chunk_size=2000):
+        entries.append((name, KIND_PRODUCT, (pk,)))
+        if cat:
+            categories.add(cat)
+            if sub:
+                subcategories.add((cat, sub))
+    entries.extend((cat, KIND_CATEGORY, (cat,)) for cat in sorted(categories))
+    entries.extend((sub, KIND_SUBCATEGORY, (cat, sub)) for cat, sub in sorted(subcategories))
+    return PrefixIndex(entries)
+
+
+_lock = threading.Lock()
+_index = None
+_index_version = None
+
+
+def get_index():
+    """Return this worker's prefix index, rebuilding it after catalog changes."""
+    global _index, _index_version
+    version = get_catalog_version()
+    if _index is None or _index_version != version:
+        with _lock:
+            if _index is None or _index_version != version:
+                _index = build_index()
+                _index_version = version
+    return _index
+
+
+def suggest(q, limit=SUGGEST_LIMIT):
+    """Return up to `limit` (label, kind, url_args) suggestions for `q`."""
+    q = (q or "").strip()
+    if len(q) < SUGGEST_MIN_LENGTH:
+        return []
+    return get_index().lookup(q, limit)
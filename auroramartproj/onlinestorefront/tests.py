@@ -1,3 +1,40 @@
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
 
-# Create your tests here.
+from adminpanel.models import Product
+
+
+# The manifest storage needs collectstatic output, which tests do not have.
+@override_settings(STORAGES={
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+})
+class AsyncCatalogViewTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.product = Product.objects.create(
+            sku_code="SKU-1",
+            product_name="Coffee Mug",
+            product_description="A mug.",
+            product_category="Home",
+            product_subcategory="Kitchen",
+            quantity_on_hand=5,
+            unit_price=12,
+            status="Active",
+        )
+
+    async def test_catalog_views_with_empty_cache(self):
+        urls = [
+            reverse("onlinestorefront:category", args=["Home"]),
+            reverse("onlinestorefront:subcategory", args=["Home", "Kitchen"]),
+            reverse("onlinestorefront:product_detail", args=[self.product.pk]),
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                # A fresh worker has no catalog:last_modified marker yet.
+                cache.clear()
+                response = await self.async_client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(response.has_header("ETag"))
@@ -0,0 +1,99 @@
+"""In-memory trigram index for typo-tolerant product search.
+
+Each worker keeps an inverted index from character trigram to the ids of
+active products whose name or subcategory contains it, rebuilt when the
+catalog version changes. Candidates are ranked by trigram overlap with the
+query (a Jaccard-style similarity), so misspellings such as "hedphones"
+still find "Headphones" without any per-query table scan.
+"""
+import re
+import threading
+
+from adminpanel.catalog import get_catalog_version
+from adminpanel.models import Product
+
+# Minimum similarity for a product to be returned as a fuzzy match.
+TRIGRAM_THRESHOLD = 0.3
+# Shorter queries have too few trigrams to tell a typo from a coincidence
+# (every word starting with "t" shares a third of the grams of "tv").
+TRIGRAM_MIN_QUERY_LENGTH = 4
+# A fuzzy match must share this many trigrams beyond the "  x" word-start gram.
+TRIGRAM_MIN_SHARED = 2
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def trigrams(text):
+    """Return the set of padded trigrams of every word in `text`."""
+    grams = set()
+    for word in _WORD_RE.findall((text or "").lower()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class TrigramIndex:
+    def __init__(self, rows):
+        # rows: iterable of (pk, text)
+        self.postings = {}
+        self.sizes = {}
+        for pk, text in rows:
+            grams = trigrams(text)
+            self.sizes[pk] = len(grams)
+            for gram in grams:
+                self.postings.setdefault(gram, []).append(pk)
+
+    def search(self, q, limit=200, threshold=TRIGRAM_THRESHOLD):
+        """Return up to `limit` product ids most similar to `q`, best first."""
+        if len("".join(_WORD_RE.findall(q or ""))) < TRIGRAM_MIN_QUERY_LENGTH:
+            return []
+        query = trigrams(q)
+        if not query:
+            return []
+        shared = {}
+        informative = {}
+        for gram in query:
+            is_informative = not gram.startswith("  ")
+            for pk in self.postings.get(gram, ()):
+                shared[pk] = shared.get(pk, 0) + 1
+                if is_informative:
+                    informative[pk] = informative.get(pk, 0) + 1
+        # Similarity relative to the query so long names are not penalised
+        # for words the shopper did not type.
+        scored = []
+        for pk, n in shared.items():
+            score = n / len(query)
+            if score >= threshold and informative.get(pk, 0) >= TRIGRAM_MIN_SHARED:
+                scored.append((-score, self.sizes[pk], pk))
+        scored.sort()
+        return [pk for _, _, pk in scored[:limit]]
+
+
+def build_index():
+    rows = (
+        Product.objects.filter(status='Active')
+        .values_list("id", "product_name", "product_subcategory")
+        .order_by("id")
+    )
+    return TrigramIndex((pk, f"{name} {sub or ''}") for pk, name, sub in rows.iterator(chunk_size=2000))
+
+
+_lock = threading.Lock()
+_index = None
+_index_version = None
+
+
+def get_index():
+    """Return this worker's trigram index, rebuilding it after catalog changes."""
+    global _index, _index_version
+    version = get_catalog_version()
+    if _index is None or _index_version != version:
+        with _lock:
+            if _index is None or _index_version != version:
+                _index = build_index()
+                _index_version = version
+    return _index
+
+
+def fuzzy_search_ids(q, limit=200):
+    return get_index().search(q, limit)
@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.urls import path
-from . import views
+from . import api, views
 
 app_name = 'onlinestorefront'
 
@@ -10,11 +10,13 @@ urlpatterns = [
     path('category/<str:category>/', views.category, name='category'),
     path('category/<str:category>/<str:subcategory>/', views.subcategory, name='subcategory'),
     path('search/', views.search, name='search'),
+    path('search/suggest/', views.search_suggest, name='search_suggest'),
     path('register/', views.Register.as_view(), name='register'),
     path('storeLogin/', views.StoreLogin.as_view(), name='storeLogin'),
     path('storeLogout/', views.StoreLogout.as_view(), name='storeLogout'),
     path('forbidden/', views.forbidden, name='store_forbidden'),
     path('settings/', views.SettingsView.as_view(), name='settings'),
+    path('settings/tab/<str:tab>/', views.SettingsTabView.as_view(), name='settings_tab'),
     # Cart
     path('cart/', views.CartView.as_view(), name='cart'),
     path('cart/add/<int:product_id>/', views.AddToCartView.as_view(), name='cart_add'),
@@ -24,4 +26,9 @@ urlpatterns = [
     # Orders
     path('orders/', views.OrdersListView.as_view(), name='orders'),
     path('orders/<int:pk>/', views.OrdersDetailView.as_view(), name='order_detail'),
+    # Read-only catalog API
+    path('api/products/', api.product_list, name='api_product_list'),
+    path('api/products/<int:pk>/', api.product_detail, name='api_product_detail'),
+    path('api/products/sku/<str:sku>/', api.product_by_sku, name='api_product_by_sku'),
+    path('api/feed/', api.catalog_feed, name='api_catalog_feed'),
 ]
\ No newline at end of file
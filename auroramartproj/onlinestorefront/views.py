@@ -9,16 +9,36 @@ from .forms import (
 )
 from django.contrib.auth.views import LoginView, LogoutView
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.urls import reverse_lazy
+from django.urls import reverse, reverse_lazy
 from django.contrib.auth.forms import PasswordChangeForm
 from django.contrib.auth import update_session_auth_hash
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
 from adminpanel.models import Product
 from django.db.models import Q
-from .models import Customer, Cart, CartItem, PaymentInformation, ShippingInformation, Order
+from .models import CartItem, PaymentInformation, ShippingInformation, Order
 from . import ml
+from . import catalog_cache
+from . import facets
+from . import search_index
+from . import suggest
+from . import trigram
+from .pagination import wants_keyset
+from .context_processors import cached_cart_count, remember_cart_count
 from functools import wraps
-from django.http import HttpRequest, HttpResponse
+from django.http import Http404, HttpRequest, HttpResponse, JsonResponse
+from django.conf import settings
+from django.middleware.csrf import get_token
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+from django.views.decorators.http import condition
+from adminpanel.catalog import get_catalog_last_modified, get_product_versions
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from .context_processors import aget_category_tree
+from .pagination import akeyset_page, datetime_keyset_page
+import asyncio
+import hashlib
+import re
+from urllib.parse import urlencode
 
 from django.contrib import messages
 from decimal import Decimal
@@ -32,7 +52,18 @@ def block_staff_superuser(view_func):
     """Decorator for function views: if an authenticated staff/superuser
     accesses a storefront view, render the storefront forbidden page.
     Anonymous users are unaffected (they continue to the view or login_required will redirect).
+    Async views are wrapped asynchronously and load the user with request.auser().
     """
+    if iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def _async_wrapped(request, *args, **kwargs):
+            user = await _aresolve_user(request)
+            if user.is_authenticated and (user.is_staff or user.is_superuser):
+                return await _arender(request, "onlinestorefront/forbidden.html", status=403)
+            return await view_func(request, *args, **kwargs)
+
+        return _async_wrapped
+
     @wraps(view_func)
     def _wrapped(request, *args, **kwargs):
         user = getattr(request, "user", None)
@@ -43,6 +74,23 @@ def block_staff_superuser(view_func):
     return _wrapped
 
 
+async def _aresolve_user(request):
+    """Load request.user through the async auth API and pin it on the request.
+
+    Later synchronous reads of request.user (ETag functions, templates) then
+    find a concrete user instead of a lazy object that would query the database.
+    """
+    user = await request.auser()
+    request.user = user
+    return user
+
+
+# Templates run context processors that may query (e.g. the cart badge), so
+# async views render in the sync thread.
+_arender = sync_to_async(render)
+_arender_to_string = sync_to_async(render_to_string)
+
+
 class CustomerOnlyMixin:
     """CBV mixin: allow access only to non-staff, non-superuser customers.
 
@@ -63,6 +111,179 @@ class CustomerOnlyMixin:
 
 
 
+def _page_or_last(paginator, page):
+    """Return `page` from `paginator`, clamping bad input like the listings do."""
+    try:
+        return paginator.page(page)
+    except PageNotAnInteger:
+        return paginator.page(1)
+    except EmptyPage:
+        return paginator.page(paginator.num_pages)
+
+
+async def _apage_or_last(qs, per_page, page):
+    """_page_or_last() over a queryset using the async ORM; the page rows are loaded."""
+    paginator = Paginator(qs, per_page)
+    # Prime the cached count so page lookups do not issue a sync COUNT(*).
+    paginator.count = await qs.acount()
+    page_obj = _page_or_last(paginator, page)
+    page_obj.object_list = [obj async for obj in page_obj.object_list]
+    return page_obj
+
+
+async def _apaginate_products(request, qs, per_page):
+    """Paginate a product listing ordered by id.
+
+    Listings are keyset (cursor) paginated: the first page and the
+    ``?after=<id>``/``?before=<id>`` links the templates emit seek on the
+    listing index without COUNT(*) or OFFSET. A bare ``?page=<n>`` (old
+    links and bookmarks) still gets the page-number paginator.
+    """
+    if "page" in request.GET and not wants_keyset(request.GET):
+        return await _apage_or_last(qs, per_page, request.GET.get("page", 1))
+
+    return await akeyset_page(qs, request.GET, per_page)
+
+
+def _catalog_etag(request, *args, **kwargs):
+    """ETag for catalog pages: catalog change time plus the viewer's header state.
+
+    The header shows the username and cart badge, so they are part of the tag;
+    the URL (path and query string) is already implied by the request.
+    """
+    user = getattr(request, "user", None)
+    user_id = user.pk if user and user.is_authenticated else 0
+    cart_count = cached_cart_count(user_id) if user_id else None
+    raw = f"{_request_catalog_last_modified(request).isoformat()}|{user_id}|{cart_count}"
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def _catalog_last_modified(request, *args, **kwargs):
+    # Only anonymous pages are identical for everyone; signed-in pages rely on the ETag.
+    user = getattr(request, "user", None)
+    if user and user.is_authenticated:
+        return None
+    return _request_catalog_last_modified(request)
+
+
+def _request_catalog_last_modified(request):
+    # Async views load it in catalog_conditional; it may need a database read.
+    last_modified = getattr(request, "catalog_last_modified", None)
+    return last_modified if last_modified is not None else get_catalog_last_modified()
+
+
+_catalog_condition = condition(etag_func=_catalog_etag, last_modified_func=_catalog_last_modified)
+
+
+def catalog_conditional(view_func):
+    """Answer If-None-Match / If-Modified-Since with 304 before the view runs any queries.
+
+    condition() calls the ETag functions synchronously, so for async views the
+    catalog change time is fetched through sync_to_async first and pinned on
+    the request.
+    """
+    conditional_view = _catalog_condition(view_func)
+    if iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def _async_wrapped(request, *args, **kwargs):
+            request.catalog_last_modified = await sync_to_async(get_catalog_last_modified)()
+            return await conditional_view(request, *args, **kwargs)
+
+        return _async_wrapped
+
+    return conditional_view
+
+
+# Stands in for the CSRF token in cached fragments; replaced per request.
+_CSRF_PLACEHOLDER = "__CSRF_TOKEN_PLACEHOLDER__"
+_CSRF_INPUT_RE = re.compile(r'(name="csrfmiddlewaretoken" value=")[^"]*(")')
+
+
+# Query parameters the cached catalog pages read. Anything else in the query
+# string is ignored by those views, so it is left out of the cache key too.
+LISTING_PAGE_PARAMS = facets.FACET_PARAMS + ("after", "before", "page")
+SEARCH_PAGE_PARAMS = ("q", "page") + facets.FACET_PARAMS
+# Longer values (e.g. pasted search text) are rendered but not cached.
+PAGE_CACHE_MAX_PARAM_LENGTH = 100
+
+
+def anonymous_page_cache(params=()):
+    """Decorator factory for catalog views: serve anonymous GETs from a full-page cache.
+
+    Pages are keyed by path and the `params` present in the query string
+    (sorted, last value wins as for QueryDict.get) under the catalog version,
+    so any product change retires every cached page and junk parameters
+    cannot multiply entries. CSRF tokens in the stored HTML (add-to-cart
+    forms) are swapped for a placeholder and filled in with this visitor's
+    token on the way out. Requests with pending flash messages are rendered
+    normally since those messages are per visitor.
+    """
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def _async_wrapped(request, *args, **kwargs):
+                user = await _aresolve_user(request)
+                key = None if _bypasses_page_cache(request, user) else _page_cache_key(request, params)
+                if key is None:
+                    return await view_func(request, *args, **kwargs)
+                cached = _cached_page(request, key)
+                if cached is not None:
+                    return cached
+                response = await view_func(request, *args, **kwargs)
+                _store_page(key, response)
+                return response
+
+            return _async_wrapped
+
+        @wraps(view_func)
+        def _wrapped(request, *args, **kwargs):
+            user = getattr(request, "user", None)
+            key = None if _bypasses_page_cache(request, user) else _page_cache_key(request, params)
+            if key is None:
+                return view_func(request, *args, **kwargs)
+            cached = _cached_page(request, key)
+            if cached is not None:
+                return cached
+            response = view_func(request, *args, **kwargs)
+            _store_page(key, response)
+            return response
+
+        return _wrapped
+
+    return decorator
+
+
+def _bypasses_page_cache(request, user):
+    return request.method != "GET" or (user and user.is_authenticated) or len(messages.get_messages(request))
+
+
+def _page_cache_key(request, params):
+    """Normalised URL for the page cache, or None if the request is not cacheable."""
+    query = []
+    for name in sorted(params):
+        if name in request.GET:
+            value = request.GET.get(name)
+            if len(value) > PAGE_CACHE_MAX_PARAM_LENGTH:
+                return None
+            query.append((name, value))
+    return f"{request.path}?{urlencode(query)}" if query else request.path
+
+
+def _cached_page(request, key):
+    cached = catalog_cache.get_page(key)
+    if cached is None:
+        return None
+    content, content_type = cached
+    return HttpResponse(content.replace(_CSRF_PLACEHOLDER, get_token(request)), content_type=content_type)
+
+
+def _store_page(key, response):
+    if response.status_code == 200 and not response.streaming and not response.cookies:
+        content = response.content.decode(response.charset)
+        content = _CSRF_INPUT_RE.sub(rf"\g<1>{_CSRF_PLACEHOLDER}\g<2>", content)
+        catalog_cache.set_page(key, content, response["Content-Type"])
+
+
 # Create your views here.
 @block_staff_superuser
 def index(request):
@@ -73,25 +294,18 @@ def index(request):
     - User with preferred_category populated: show random selection drawn from that category.
     """
     preferred_category = ""
-    if request.user.is_authenticated:
-        try:
-            preferred_category = request.user.profile.preferred_category or ""
-        except Exception:
-            preferred_category = ""  # profile absent
+    if request.customer:
+        preferred_category = request.customer.preferred_category or ""
 
-    # Only consider active products for storefront visibility
-    base_qs = Product.objects.filter(status='Active')
+    # Only consider active products for storefront visibility. Sampling draws
+    # from cached id lists instead of ORDER BY RANDOM() over the whole table.
+    products = []
     if preferred_category:
         # Filter by preferred category; if no products match, fall back to global random sample.
-        category_qs = Product.objects.filter(product_category=preferred_category, status='Active')
-        if category_qs.exists():
-            sample_qs = category_qs.order_by("?")[:20]
-        else:
-            sample_qs = base_qs.order_by("?")[:20]
-    else:
-        sample_qs = base_qs.order_by("?")[:20]
+        products = catalog_cache.sample_active_products(preferred_category, 20)
+    if not products:
+        products = catalog_cache.sample_active_products(k=20)
 
-    products = list(sample_qs)
     context = {
         "random_products": products,
         "preferred_category": preferred_category,
@@ -100,112 +314,153 @@ def index(request):
 
 
 @block_staff_superuser
-def category(request, category: str):
+@catalog_conditional
+@anonymous_page_cache(params=LISTING_PAGE_PARAMS)
+async def category(request, category: str):
     cat = (category or "").strip()
     if not cat:
-        return render(request, "onlinestorefront/category.html", {"category_name": category, "subcategories": []}, status=404)
-
-    subcategories = []
-    sub_names = (
-        Product.objects.filter(product_category=cat, status='Active')
-        .exclude(product_subcategory__isnull=True)
-        .exclude(product_subcategory="")
-        .values_list("product_subcategory", flat=True)
-        .distinct()
-    )
-    for sname in sub_names:
-        items = list(
-            Product.objects.filter(
-                product_category=cat,
-                product_subcategory=sname,
-                status='Active'
-            ).order_by("id")[:4]
-        )
-        subcategories.append({"name": sname, "products": items})
+        return await _arender(request, "onlinestorefront/category.html", {"category_name": category, "subcategories": []}, status=404)
 
-    # Also provide a paginated listing of all products in the category
+    # Also provide a paginated listing of all products in the category,
+    # narrowed by any selected facets (subcategory, price band, in stock)
+    selected = facets.parse_facets(request.GET)
+    selected.pop("cat", None)
     qs = Product.objects.filter(product_category=cat, status='Active').order_by("id")
-    paginator = Paginator(qs, 20)
-    page = request.GET.get("page", 1)
-    try:
-        page_obj = paginator.page(page)
-    except PageNotAnInteger:
-        page_obj = paginator.page(1)
-    except EmptyPage:
-        page_obj = paginator.page(paginator.num_pages)
 
-    return render(
+    # Up to 4 products per subcategory (one windowed query cached per catalog
+    # version), the listing page, facet counts and the header category tree
+    subcategories, page_obj, counts, _ = await asyncio.gather(
+        catalog_cache.asubcategory_strips(cat, 4),
+        _apaginate_products(request, facets.apply_facets(qs, selected), 20),
+        catalog_cache.alisting_facet_counts(cat),
+        aget_category_tree(),
+    )
+
+    return await _arender(
         request,
         "onlinestorefront/category.html",
-        {"category_name": cat, "subcategories": subcategories, "page_obj": page_obj},
+        {
+            "category_name": cat,
+            "subcategories": subcategories,
+            "page_obj": page_obj,
+            "facet_groups": facets.facet_groups(request.GET, counts, selected, include=("sub", "price", "in_stock")),
+            "facet_query": facets.facet_querystring(request.GET),
+        },
     )
 
 
 @block_staff_superuser
-def subcategory(request, category: str, subcategory: str):
+@catalog_conditional
+@anonymous_page_cache(params=LISTING_PAGE_PARAMS)
+async def subcategory(request, category: str, subcategory: str):
     """Subcategory product listing page with pagination.
 
-    /category/<category>/<subcategory>/?page=<n>
+    /category/<category>/<subcategory>/?after=<id> (or ?before=<id>)
     """
     cat = (category or "").strip()
     sub = (subcategory or "").strip()
     if not (cat and sub):
         return redirect(reverse_lazy("onlinestorefront:index"))
 
+    selected = facets.parse_facets(request.GET)
+    selected.pop("cat", None)
+    selected.pop("sub", None)
     qs = Product.objects.filter(
         product_category=cat,
         product_subcategory=sub,
         status='Active'
     ).order_by("id")
-    paginator = Paginator(qs, 10)
-    page = request.GET.get("page", 1)
-    try:
-        page_obj = paginator.page(page)
-    except PageNotAnInteger:
-        page_obj = paginator.page(1)
-    except EmptyPage:
-        page_obj = paginator.page(paginator.num_pages)
+    page_obj, counts, _ = await asyncio.gather(
+        _apaginate_products(request, facets.apply_facets(qs, selected), 10),
+        catalog_cache.alisting_facet_counts(cat, sub),
+        aget_category_tree(),
+    )
 
-    return render(
+    return await _arender(
         request,
         "onlinestorefront/subcategory.html",
         {
             "category_name": cat,
             "current_subcategory": sub,
             "page_obj": page_obj,
+            "facet_groups": facets.facet_groups(request.GET, counts, selected, include=("price", "in_stock")),
+            "facet_query": facets.facet_querystring(request.GET),
         },
     )
 
 
-@block_staff_superuser
-def product_detail(request, pk: int):
-    """Show details for a single product."""
-    # Only serve active products; treat inactive/missing as 404
-    product = Product.objects.filter(pk=pk, status='Active').first()
-    if not product:
-        return render(
-            request,
-            "onlinestorefront/product_detail.html",
-            {"product": None},
-            status=404,
-        )
+async def _arecommended_products(product):
+    """Return (active recommended products, {pk: version stamp} of every candidate).
 
-    # Compute recommendations (by SKU) using association rules if available
-    recommended_products = []
+    Recommendations come from the association rules by SKU. Candidates are
+    fetched in any status so reactivating one also invalidates the cached page.
+    Their stamps are read before their rows, so a save committing in between
+    leaves the cached page already stale rather than pinned to old data.
+    """
     try:
         sku = getattr(product, 'sku_code', None)
-        if sku:
-            rec_skus = ml.get_recommendations(ml.loaded_rules, [sku], metric='lift', top_n=5)
-            if rec_skus:
-                # Fetch matching Product objects; ignore missing SKUs
-                recommended_products = list(Product.objects.filter(sku_code__in=rec_skus, status='Active')[:5])
+        rec_skus = ml.get_recommendations(ml.loaded_rules, [sku], metric='lift', top_n=5) if sku else []
+        if not rec_skus:
+            return [], {}
+        # Ignore SKUs without a matching product
+        candidate_pks = [pk async for pk in Product.objects.filter(sku_code__in=rec_skus).values_list("pk", flat=True)]
+        versions = get_product_versions(candidate_pks)
+        candidates = [p async for p in Product.objects.filter(pk__in=candidate_pks).order_by("id")]
     except Exception:
-        recommended_products = []
+        return [], {}
+    return [p for p in candidates if p.status == 'Active'][:5], versions
 
-    return render(
+
+@block_staff_superuser
+@catalog_conditional
+@anonymous_page_cache()
+async def product_detail(request, pk: int):
+    """Show details for a single product.
+
+    The product body and recommendation strip are rendered once and cached
+    per product (see catalog_cache.get_product_fragment); the entry is dropped
+    when the product or any of its recommended products is saved or toggled.
+    The header (user, cart badge) is still rendered live on every request.
+    """
+    entry = catalog_cache.get_product_fragment(pk)
+    if entry is None:
+        # Stamp before querying; see _arecommended_products.
+        deps = get_product_versions([pk])
+        # Only serve active products; treat inactive/missing as 404
+        product = await Product.objects.filter(pk=pk, status='Active').afirst()
+        if not product:
+            return await _arender(
+                request,
+                "onlinestorefront/product_detail.html",
+                {"product": None},
+                status=404,
+            )
+
+        # Recommendations and the header category tree load concurrently
+        (recommended_products, rec_versions), _ = await asyncio.gather(
+            _arecommended_products(product),
+            aget_category_tree(),
+        )
+
+        html = await _arender_to_string(
+            "onlinestorefront/product_detail_body.html",
+            {
+                "product": product,
+                "recommended_products": recommended_products,
+                "MEDIA_URL": settings.MEDIA_URL,
+                "csrf_token": _CSRF_PLACEHOLDER,
+            },
+        )
+        deps.update(rec_versions)
+        entry = catalog_cache.set_product_fragment(
+            pk, deps, html=html, product={"id": product.pk, "product_name": product.product_name},
+        )
+
+    body = entry["html"].replace(_CSRF_PLACEHOLDER, get_token(request))
+    return await _arender(
         request,
         "onlinestorefront/product_detail.html",
-        {"product": product, "recommended_products": recommended_products},
+        {"product": entry["product"], "product_body": mark_safe(body)},
     )
 
 
@@ -217,6 +472,7 @@ class Register(View):
     def post(self, request):
         form = BasicRegisterForm(request.POST)
         if form.is_valid():
+            # Creates the User, Customer and Cart in one transaction.
             form.save()
             return redirect("/")
         return render(request, "onlinestorefront/register.html", {"form": form})
@@ -252,6 +508,9 @@ class StoreLogout(LogoutView):
     next_page = reverse_lazy("onlinestorefront:index")
 
 
+SETTINGS_TABS = ("account", "profile", "shipping", "payments", "password")
+
+
 class SettingsView(CustomerOnlyMixin, LoginRequiredMixin, View):
     """Unified settings page with sub-navigation for Profile, Payments, Shipping.
 
@@ -262,41 +521,62 @@ class SettingsView(CustomerOnlyMixin, LoginRequiredMixin, View):
     login_url = reverse_lazy("onlinestorefront:storeLogin")
 
     def _build_context(self, request, active_tab: str):
-        customer_obj, _ = Customer.objects.get_or_create(user=request.user)
-        # Build per-item edit forms for inline editing
-        payments = list(PaymentInformation.objects.filter(customer=customer_obj).order_by("-id"))
-        shippings = list(ShippingInformation.objects.filter(customer=customer_obj).order_by("-id"))
-        payment_pairs = [{"obj": p, "form": PaymentInformationForm(instance=p)} for p in payments]
-        shipping_pairs = [{"obj": s, "form": ShippingInformationForm(instance=s)} for s in shippings]
+        """Build the context of the active tab only.
 
+        Each tab has its own template (``settings_<tab>.html``); the others
+        are fetched on demand from SettingsTabView, so e.g. the account tab
+        never loads saved cards and addresses.
+        """
         ctx = {
             "active_tab": active_tab,
+            "tab_template": f"onlinestorefront/settings_{active_tab}.html",
+        }
+        ctx.update(getattr(self, f"_{active_tab}_context")(request))
+        return ctx
+
+    def _account_context(self, request):
+        return {"account_form": AccountParticularsForm(instance=request.user)}
+
+    def _profile_context(self, request):
+        customer_obj = request.customer
+        return {
             "profile_form": CustomerProfileForm(instance=customer_obj),
-            "account_form": AccountParticularsForm(instance=request.user),
+            "preferred_category": customer_obj.preferred_category,
+        }
+
+    def _password_context(self, request):
+        return {"password_form": PasswordChangeForm(user=request.user)}
+
+    def _payments_context(self, request):
+        # Build per-item edit forms for inline editing
+        payments = list(PaymentInformation.objects.filter(customer=request.customer).order_by("-id"))
+        return {
             "payment_form": PaymentInformationForm(),
-            "shipping_form": ShippingInformationForm(),
-            "password_form": PasswordChangeForm(user=request.user),
             "payments": payments,
+            "payment_pairs": [{"obj": p, "form": PaymentInformationForm(instance=p)} for p in payments],
+        }
+
+    def _shipping_context(self, request):
+        shippings = list(ShippingInformation.objects.filter(customer=request.customer).order_by("-id"))
+        return {
+            "shipping_form": ShippingInformationForm(),
             "shippings": shippings,
-            "payment_pairs": payment_pairs,
-            "shipping_pairs": shipping_pairs,
-            "preferred_category": customer_obj.preferred_category,
+            "shipping_pairs": [{"obj": s, "form": ShippingInformationForm(instance=s)} for s in shippings],
         }
-        return ctx
 
     def get(self, request):
         tab = request.GET.get("tab", "account").lower()
-        if tab not in {"profile", "account", "password", "payments", "shipping"}:
+        if tab not in SETTINGS_TABS:
             tab = "account"
         ctx = self._build_context(request, tab)
         return render(request, "onlinestorefront/settings.html", ctx)
 
     def post(self, request):
         tab = (request.POST.get("tab") or request.GET.get("tab") or "account").lower()
-        if tab not in {"profile", "account", "password", "payments", "shipping"}:
+        if tab not in SETTINGS_TABS:
             tab = "account"
 
-        customer_obj, _ = Customer.objects.get_or_create(user=request.user)
+        customer_obj = request.customer
 
         if tab == "profile":
             form = CustomerProfileForm(request.POST, instance=customer_obj)
@@ -456,23 +736,33 @@ class SettingsView(CustomerOnlyMixin, LoginRequiredMixin, View):
         return redirect(reverse_lazy("onlinestorefront:settings"))
 
 
+class SettingsTabView(SettingsView):
+    """Render one settings tab without the page chrome, for in-page tab switching."""
+
+    http_method_names = ["get"]
+
+    def get(self, request, tab):
+        if tab not in SETTINGS_TABS:
+            raise Http404("Unknown settings tab.")
+        ctx = self._build_context(request, tab)
+        return render(request, ctx["tab_template"], ctx)
+
+
 # -----------------------------
 # Cart views
 # -----------------------------
-def _get_user_cart(user) -> Cart:
-    """Return or create the user's cart."""
-    cart, _ = Cart.objects.get_or_create(user=user)
-    return cart
-
-
 class CartView(CustomerOnlyMixin, LoginRequiredMixin, View):
     """Display the current user's cart with items and totals."""
     login_url = reverse_lazy("onlinestorefront:storeLogin")
 
     def get(self, request: HttpRequest) -> HttpResponse:
-        cart = _get_user_cart(request.user)
+        cart = request.cart
         # Prefetch product for efficiency
-        items = cart.items.select_related("product").all()
+        items = list(cart.items.select_related("product").all())
+        # Show the badge from the rows we just loaded; Cart.item_count is
+        # only written by the views that change the cart.
+        remember_cart_count(request, len(items))
+        recs_by_sku = self._recommendations_by_sku(items)
         # Compute totals
         line_items = []
         subtotal = 0
@@ -482,15 +772,7 @@ class CartView(CustomerOnlyMixin, LoginRequiredMixin, View):
             line_total = price * qty
             subtotal += line_total
             # Per-item recommendations (association rules by SKU)
-            recs = []
-            try:
-                sku = getattr(it.product, 'sku_code', None)
-                if sku:
-                    rec_skus = ml.get_recommendations(ml.loaded_rules, [sku], metric='lift', top_n=5)
-                    if rec_skus:
-                        recs = list(Product.objects.filter(sku_code__in=rec_skus, status='Active')[:5])
-            except Exception:
-                recs = []
+            recs = recs_by_sku.get(getattr(it.product, 'sku_code', None), [])
             line_items.append({
                 "item": it,
                 "product": it.product,
@@ -507,6 +789,32 @@ class CartView(CustomerOnlyMixin, LoginRequiredMixin, View):
         }
         return render(request, "onlinestorefront/cart.html", context)
 
+    @staticmethod
+    def _recommendations_by_sku(items):
+        """Map each cart SKU to up to 5 recommended active products.
+
+        Rules for every SKU are looked up in one batch and all recommended
+        products are resolved with a single query, so the cost does not grow
+        with one query per cart line.
+        """
+        skus = [it.product.sku_code for it in items if getattr(it.product, 'sku_code', None)]
+        if not skus:
+            return {}
+        try:
+            rec_skus_by_sku = ml.get_recommendations_batch(ml.loaded_rules, skus, metric='lift', top_n=5)
+            wanted = {s for rec_skus in rec_skus_by_sku.values() for s in rec_skus}
+            if not wanted:
+                return {}
+            candidates = list(Product.objects.filter(sku_code__in=wanted, status='Active').order_by("id"))
+        except Exception:
+            return {}
+
+        recs_by_sku = {}
+        for sku, rec_skus in rec_skus_by_sku.items():
+            rec_set = set(rec_skus)
+            recs_by_sku[sku] = [p for p in candidates if p.sku_code in rec_set][:5]
+        return recs_by_sku
+
 
 class AddToCartView(CustomerOnlyMixin, LoginRequiredMixin, View):
     """Add a product to the cart. POST only; increments quantity if exists."""
@@ -523,7 +831,7 @@ class AddToCartView(CustomerOnlyMixin, LoginRequiredMixin, View):
             messages.warning(request, "This product is inactive and cannot be added to cart.")
             return redirect("onlinestorefront:cart")
 
-        cart = _get_user_cart(request.user)
+        cart = request.cart
         qty = 1
         try:
             qty = int(request.POST.get("quantity", 1))
@@ -535,12 +843,15 @@ class AddToCartView(CustomerOnlyMixin, LoginRequiredMixin, View):
             messages.warning(request, "This product is out of stock.")
             return redirect("onlinestorefront:cart")
 
-        item, created = CartItem.objects.get_or_create(cart=cart, product=product, defaults={"quantity": min(qty, product.quantity_on_hand)})
-        if not created:
-            new_qty = item.quantity + qty
-            max_allowed = product.quantity_on_hand
-            item.quantity = max(1, min(new_qty, max_allowed))
-            item.save(update_fields=["quantity"])
+        with transaction.atomic():
+            item, created = CartItem.objects.get_or_create(cart=cart, product=product, defaults={"quantity": min(qty, product.quantity_on_hand)})
+            if created:
+                remember_cart_count(request, cart.adjust_item_count(1))
+            else:
+                new_qty = item.quantity + qty
+                max_allowed = product.quantity_on_hand
+                item.quantity = max(1, min(new_qty, max_allowed))
+                item.save(update_fields=["quantity"])
 
         messages.success(request, "Product added to cart." if created else "Cart updated.")
         return redirect("onlinestorefront:cart")
@@ -564,7 +875,9 @@ class UpdateCartItemView(CustomerOnlyMixin, LoginRequiredMixin, View):
         op = request.POST.get("op")
         max_allowed = item.product.quantity_on_hand
         if max_allowed <= 0:
-            item.delete()
+            with transaction.atomic():
+                item.delete()
+                remember_cart_count(request, item.cart.adjust_item_count(-1))
             return redirect("onlinestorefront:cart")
 
         if op == "inc":
@@ -587,7 +900,10 @@ class RemoveCartItemView(CustomerOnlyMixin, LoginRequiredMixin, View):
     login_url = reverse_lazy("onlinestorefront:storeLogin")
 
     def post(self, request: HttpRequest, item_id: int) -> HttpResponse:
-        deleted, _ = CartItem.objects.filter(pk=item_id, cart__user=request.user).delete()
+        with transaction.atomic():
+            deleted, _ = CartItem.objects.filter(pk=item_id, cart__user=request.user).delete()
+            if deleted:
+                remember_cart_count(request, request.cart.adjust_item_count(-deleted))
         if deleted:
             messages.success(request, "Item removed from cart.")
         else:
@@ -600,7 +916,7 @@ class CheckoutView(CustomerOnlyMixin, LoginRequiredMixin, View):
     login_url = reverse_lazy("onlinestorefront:storeLogin")
 
     def build_context(self, request, selected_ids=None, selected_payment=None, selected_shipping=None):
-        cart = _get_user_cart(request.user)
+        cart = request.cart
         items_qs = cart.items.select_related("product")
         if selected_ids:
             items_qs = items_qs.filter(id__in=selected_ids)
@@ -625,7 +941,7 @@ class CheckoutView(CustomerOnlyMixin, LoginRequiredMixin, View):
         if not line_items:
             return None
 
-        customer_obj, _ = Customer.objects.get_or_create(user=request.user)
+        customer_obj = request.customer
         payments = list(PaymentInformation.objects.filter(customer=customer_obj).order_by("-id"))
         shippings = list(ShippingInformation.objects.filter(customer=customer_obj).order_by("-id"))
 
@@ -673,7 +989,7 @@ class CheckoutView(CustomerOnlyMixin, LoginRequiredMixin, View):
         shipping_id = request.POST.get("shipping_id")
         selected_payment = None
         selected_shipping = None
-        customer_obj, _ = Customer.objects.get_or_create(user=request.user)
+        customer_obj = request.customer
         if payment_id:
             try:
                 selected_payment = PaymentInformation.objects.get(pk=int(payment_id), customer=customer_obj)
@@ -708,7 +1024,7 @@ class CheckoutView(CustomerOnlyMixin, LoginRequiredMixin, View):
             # Create order inside an atomic transaction and lock involved products
             from .models import Order, OrderItems
 
-            cart = _get_user_cart(request.user)
+            cart = request.cart
             items_qs = cart.items.select_related("product")
             if selected_ids:
                 items_qs = items_qs.filter(id__in=selected_ids)
@@ -736,8 +1052,13 @@ class CheckoutView(CustomerOnlyMixin, LoginRequiredMixin, View):
                             return render(request, "onlinestorefront/checkout.html", ctx)
 
                     # All checks passed; create the Order
+                    lines = []
+                    for it in items_qs:
+                        prod = locked_products[it.product.pk]
+                        price = Decimal(str(getattr(prod, "unit_price", 0) or 0))
+                        lines.append((prod, int(it.quantity or 0), price))
                     total_amount = Decimal(str(ctx.get("subtotal", 0)))
-                    order = Order.objects.create(
+                    order = Order(
                         total_amount=total_amount,
                         status="pending",
                         customer=customer_obj,
@@ -755,12 +1076,11 @@ class CheckoutView(CustomerOnlyMixin, LoginRequiredMixin, View):
                         shipping_country=selected_shipping.country,
                         shipping_contact_number=selected_shipping.contact_number,
                     )
+                    order.set_summary(lines)
+                    order.save()
 
                     # Create order items and deduct stock
-                    for it in items_qs:
-                        prod = locked_products.get(it.product.pk)
-                        qty = int(it.quantity or 0)
-                        price = Decimal(str(getattr(prod, "unit_price", 0) or 0))
+                    for prod, qty, price in lines:
                         OrderItems.objects.create(order=order, product=prod, quantity=qty, price_at_purchase=price)
                         # Deduct stock if supported
                         if hasattr(prod, "quantity_on_hand"):
@@ -768,7 +1088,8 @@ class CheckoutView(CustomerOnlyMixin, LoginRequiredMixin, View):
                             prod.save(update_fields=["quantity_on_hand"])
 
                     # Remove purchased items from cart
-                    items_qs.delete()
+                    removed, _ = items_qs.delete()
+                    remember_cart_count(request, cart.adjust_item_count(-removed))
 
                     return render(request, "onlinestorefront/order_success.html", {"order": order})
             except Exception:
@@ -781,40 +1102,117 @@ class CheckoutView(CustomerOnlyMixin, LoginRequiredMixin, View):
 # -----------------------------
 # Product search
 # -----------------------------
-def search(request: HttpRequest) -> HttpResponse:
-    """Basic product search endpoint.
+SEARCH_PAGE_SIZE = 20
+# Below this many exact matches, typo-tolerant trigram matches are appended.
+SEARCH_FUZZY_MIN_RESULTS = 5
+
+
+@anonymous_page_cache(params=SEARCH_PAGE_PARAMS)
+async def search(request: HttpRequest) -> HttpResponse:
+    """Product search endpoint.
 
-    Query string parameter:
-      q: the search term (case-insensitive). We perform an icontains match
-         against product name, description, category and subcategory.
+    Query string parameters:
+      q: the search term. Matched against the FTS5 index over product name,
+         description, category and subcategory, ranked by BM25 with the
+         name weighted highest. Without FTS5 we fall back to an icontains
+         match ordered by name. When fewer than SEARCH_FUZZY_MIN_RESULTS
+         products match exactly, close trigram matches on name and
+         subcategory are appended (see onlinestorefront.trigram).
+      page: result page number (SEARCH_PAGE_SIZE results per page).
+      cat, sub, price, in_stock: facet filters (see onlinestorefront.facets).
 
     Behaviour:
       - Empty or missing q -> render page with no results and guidance.
-      - Non-empty q -> up to 200 matching products ordered by name.
+      - Non-empty q -> paginated matching active products.
     """
     raw_q = request.GET.get("q", "")
     q = (raw_q or "").strip()
     products = []
     total = 0
+    page_obj = None
+    groups = []
+    fuzzy = False
+    selected = facets.parse_facets(request.GET)
     if q:
-        # Build a single combined OR filter.
-        filter_q = (
-            Q(product_name__icontains=q)
-            | Q(product_description__icontains=q)
-            | Q(product_category__icontains=q)
-            | Q(product_subcategory__icontains=q)
-        )
-        qs = Product.objects.filter(filter_q, status='Active').order_by("product_name")[:200]
-        products = list(qs)
-        total = len(products)
+        active = Product.objects.filter(status='Active')
+        use_fts = await sync_to_async(search_index.fts_supported)()
+        if use_fts:
+            matched = search_index.matching_products(active, q)
+        else:
+            # Build a single combined OR filter.
+            filter_q = (
+                Q(product_name__icontains=q)
+                | Q(product_description__icontains=q)
+                | Q(product_category__icontains=q)
+                | Q(product_subcategory__icontains=q)
+            )
+            matched = active.filter(filter_q)
+        counts = await facets.afacet_counts(matched)
+        # Ranked id list to paginate, or None to paginate the icontains queryset
+        ranked = None
+        if counts["total"] < SEARCH_FUZZY_MIN_RESULTS:
+            # Too few exact hits (e.g. a typo): append trigram matches after them.
+            fuzzy_ids = await sync_to_async(trigram.fuzzy_search_ids)(q)
+            if fuzzy_ids:
+                exact_qs = search_index.order_by_rank(matched) if use_fts else matched.order_by("product_name")
+                exact = [pk async for pk in exact_qs.values_list("pk", flat=True)]
+                exact_set = set(exact)
+                ranked = exact + [pk for pk in fuzzy_ids if pk not in exact_set]
+                matched = active.filter(pk__in=ranked)
+                fuzzy = len(ranked) > len(exact)
+                if fuzzy:
+                    counts = await facets.afacet_counts(matched)
+        groups = facets.facet_groups(request.GET, counts, selected)
+
+        page = request.GET.get("page", 1)
+        filtered = facets.apply_facets(matched, selected)
+        if ranked is not None:
+            if selected:
+                allowed = {pk async for pk in filtered.values_list("pk", flat=True)}
+                ranked = [pk for pk in ranked if pk in allowed]
+        elif use_fts:
+            # Facets are applied in the same SQL as the MATCH; only the ids
+            # are ranked here, the visible page is loaded below.
+            ranked = [pk async for pk in search_index.order_by_rank(filtered).values_list("pk", flat=True)]
+        if ranked is not None:
+            page_obj = _page_or_last(Paginator(ranked, SEARCH_PAGE_SIZE), page)
+            found = await active.ain_bulk(list(page_obj.object_list))
+            products = [found[pk] for pk in page_obj.object_list if pk in found]
+        else:
+            qs = filtered.order_by("product_name")
+            page_obj = await _apage_or_last(qs, SEARCH_PAGE_SIZE, page)
+            products = page_obj.object_list
+        total = page_obj.paginator.count
     context = {
         "query": q,
         "raw_query": raw_q,  # original before strip (for potential UX later)
         "products": products,
         "total": total,
-        "limit": 200,
+        "page_obj": page_obj,
+        "facet_groups": groups,
+        "facet_query": facets.facet_querystring(request.GET),
+        "fuzzy": fuzzy,
+    }
+    return await _arender(request, "onlinestorefront/search_results.html", context)
+
+
+def search_suggest(request: HttpRequest) -> JsonResponse:
+    """Typeahead suggestions for the search box, served from the in-process prefix index.
+
+    GET /onlinestorefront/search/suggest/?q=<prefix>
+    Returns {"query": q, "suggestions": [{"label", "type", "url"}, ...]}.
+    """
+    q = (request.GET.get("q") or "").strip()
+    url_names = {
+        suggest.KIND_PRODUCT: "onlinestorefront:product_detail",
+        suggest.KIND_CATEGORY: "onlinestorefront:category",
+        suggest.KIND_SUBCATEGORY: "onlinestorefront:subcategory",
     }
-    return render(request, "onlinestorefront/search_results.html", context)
+    suggestions = [
+        {"label": label, "type": kind, "url": reverse(url_names[kind], args=args)}
+        for label, kind, args in suggest.suggest(q)
+    ]
+    return JsonResponse({"query": q, "suggestions": suggestions})
 
 
 # -----------------------------
@@ -826,52 +1224,39 @@ def search(request: HttpRequest) -> HttpResponse:
 # -----------------------------
 # Orders
 # -----------------------------
+ORDERS_PAGE_SIZE = 10
+
+
 class OrdersListView(CustomerOnlyMixin, LoginRequiredMixin, View):
     """List all orders made by the logged-in customer."""
     login_url = reverse_lazy("onlinestorefront:storeLogin")
 
     def get(self, request):
-        customer_obj, _ = Customer.objects.get_or_create(user=request.user)
-        orders = (
-            Order.objects.filter(customer=customer_obj)
-            .prefetch_related("order_items", "order_items__product")
-            .order_by("-created_at")
+        # Summary columns are written at checkout, so the list never reads OrderItems.
+        orders = Order.objects.filter(customer=request.customer).only(
+            "id", "created_at", "status", "total_amount", "item_count", "item_preview"
+        )
+        page_obj = datetime_keyset_page(orders, request.GET, ORDERS_PAGE_SIZE)
+        return render(
+            request,
+            "onlinestorefront/orders.html",
+            {"orders": page_obj.object_list, "page_obj": page_obj},
         )
-
-        # Build a lightweight structure for template rendering
-        order_list = []
-        for o in orders:
-            count = getattr(o, "order_items", None).count() if hasattr(o, "order_items") else 0
-            preview_items = list(o.order_items.all()[:5])
-            order_list.append(
-                {
-                    "id": o.id,
-                    "created_at": o.created_at,
-                    "status": o.status,
-                    "total_amount": o.total_amount,
-                    "item_count": count,
-                    "items": preview_items,  # preview up to 5
-                    "remaining": max(0, count - len(preview_items)),
-                }
-            )
-
-        return render(request, "onlinestorefront/orders.html", {"orders": order_list})
 
 
 class OrdersDetailView(CustomerOnlyMixin, LoginRequiredMixin, View):
     """Show the details of a single order placed by the current customer."""
     login_url = reverse_lazy("onlinestorefront:storeLogin")
 
-    def get_object(self, user, pk):
-        customer_obj, _ = Customer.objects.get_or_create(user=user)
+    def get_object(self, request, pk):
         return (
             Order.objects.prefetch_related("order_items", "order_items__product")
-            .get(pk=pk, customer=customer_obj)
+            .get(pk=pk, customer=request.customer)
         )
 
     def get(self, request, pk):
         try:
-            order = self.get_object(request.user, pk)
+            order = self.get_object(request, pk)
         except Order.DoesNotExist:
             return redirect("onlinestorefront:orders")
 